@@ -1,22 +1,194 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 import numpy as np
 import pandas as pd
 
+try:
+    import resource
+except ImportError:  # Windows has no getrusage; peak RSS is reported as null.
+    resource = None
+
 
 REQUIRED_COLUMNS = {"user_id", "age", "monthly_spend", "region"}
 NUMERIC_COLUMNS = ("age", "monthly_spend")
+PIPELINE_MODES = ("copy", "fused")
+
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
+OUTPUT_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# Applied when writing Parquet/Feather; CSV output keeps pandas' inferred types.
+COLUMNAR_DTYPES = {"region": "category", "monthly_spend": "float32", "age": "int32"}
+# Read-time dtypes for optimize=True; other columns are inferred, then shrunk
+# by optimize_dtypes.
+LOAD_DTYPES = {"region": "category"}
+# Text columns with at most this share of distinct values become categoricals;
+# the rest become pyarrow-backed strings.
+CATEGORY_MAX_RATIO = 0.5
+# Part of every incremental cache key; bump it whenever cleaning rules change
+# so outputs cached by an older version are recomputed.
+PIPELINE_VERSION = "1"
+PROFILE_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Per-column bound on the hashes (distinct counts) and sampled values
+# (quantiles) a ProfileSketch keeps for chunked or partitioned input.
+SKETCH_SIZE = 4096
+INCREMENTAL_DIR = ".incremental"
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+class StageRecorder:
+    # Records wall time, CPU time, rows in/out and peak-RSS growth per pipeline
+    # stage. Disabled recorders skip every clock and rusage call, so
+    # instrumented code costs one dict per stage when reporting is off.
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stages: list[dict] = []
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None) -> Iterator[dict]:
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+        if not self.enabled:
+            yield record
+            return
+        rss_before = _peak_rss_mb()
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        yield record
+        record["wall_seconds"] = round(time.perf_counter() - wall_started, 6)
+        record["cpu_seconds"] = round(time.process_time() - cpu_started, 6)
+        rss_after = _peak_rss_mb()
+        # Growth of the process high-water mark: memory this stage needed
+        # beyond anything an earlier stage already touched.
+        record["peak_rss_mb"] = None if rss_after is None else round(rss_after, 3)
+        record["peak_rss_delta_mb"] = None if rss_after is None else round(rss_after - rss_before, 3)
+        self.stages.append(record)
+
+
+NO_STAGES = StageRecorder(enabled=False)
+
 
+def detect_format(path: Path) -> str:
+    file_format = FILE_FORMATS.get(path.suffix.lower())
+    if file_format is None:
+        raise ValueError(f"Unsupported file type {path.suffix!r}; expected one of {sorted(FILE_FORMATS)}")
+    return file_format
 
-def load_customers(csv_path: str) -> pd.DataFrame:
+
+def read_column_names(path: Path, file_format: str) -> list[str]:
+    if file_format == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    import pyarrow.dataset as ds
+
+    return ds.dataset(path, format="ipc" if file_format == "feather" else "parquet").schema.names
+
+
+def load_customers(
+    csv_path: str,
+    columns: Iterable[str] | None = None,
+    optimize: bool = False,
+) -> pd.DataFrame:
     path = Path(csv_path)
     if not path.exists():
-        raise ValueError(f"Input CSV not found: {path}")
-    return pd.read_csv(path)
+        raise ValueError(f"Input file not found: {path}")
+    file_format = detect_format(path)
+
+    available = None
+    if columns is not None or optimize or file_format == "parquet":
+        available = read_column_names(path, file_format)
+    if columns is not None:
+        # Project only columns that exist, in file order; validate_required_columns
+        # reports the rest.
+        requested = set(columns)
+        columns = [col for col in available if col in requested]
+
+    if file_format == "csv":
+        dtype = {col: dtype for col, dtype in LOAD_DTYPES.items() if optimize and col in available}
+        df = pd.read_csv(path, usecols=columns, dtype=dtype or None)
+    elif file_format == "parquet":
+        # region is low-cardinality: decode it straight to a categorical whenever it is read.
+        wanted = columns if columns is not None else available
+        dictionary = ["region"] if "region" in wanted else None
+        df = pd.read_parquet(path, columns=columns, read_dictionary=dictionary)
+    else:
+        df = pd.read_feather(path, columns=columns)
+    return optimize_dtypes(df) if optimize else df
+
+
+def optimize_dtypes(df: pd.DataFrame, category_max_ratio: float = CATEGORY_MAX_RATIO) -> pd.DataFrame:
+    # Integers go to the smallest signed type that holds them and floats to
+    # float32 (about 7 significant digits). Unparseable values in the numeric
+    # columns become NaN here, which is what coerce_numeric_columns would do anyway.
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        is_text = pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+        if col in NUMERIC_COLUMNS and is_text:
+            series = pd.to_numeric(series, errors="coerce")
+
+        if pd.api.types.is_bool_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+            pass
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            series = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype):
+            series = pd.to_numeric(series, downcast="float")
+        elif is_text:
+            if series.nunique(dropna=True) <= category_max_ratio * len(series):
+                series = series.astype("category")
+            else:
+                series = series.astype("string[pyarrow]")
+        columns[col] = series
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def memory_report(df: pd.DataFrame) -> dict:
+    usage = df.memory_usage(deep=True, index=True)
+    report = {col: round(int(usage[col]) / 1024**2, 3) for col in df.columns}
+    report["total"] = round(int(usage.sum()) / 1024**2, 3)
+    return report
+
+
+def fill_missing_region(region: pd.Series) -> pd.Series:
+    if isinstance(region.dtype, pd.CategoricalDtype) and "unknown" not in region.cat.categories:
+        region = region.cat.add_categories("unknown")
+    return region.fillna("unknown")
+
+
+def apply_columnar_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for col, dtype in COLUMNAR_DTYPES.items():
+        if col not in out.columns:
+            continue
+        if dtype.startswith("int") and not np.all(np.mod(out[col].to_numpy(dtype=float), 1) == 0):
+            # Fractional ages would be truncated; keep them as floats instead.
+            continue
+        out[col] = out[col].astype(dtype)
+    return out
 
 
 def validate_required_columns(df: pd.DataFrame, required_columns: Iterable[str]) -> None:
@@ -39,7 +211,7 @@ def filter_invalid_rows(df: pd.DataFrame) -> pd.DataFrame:
     out = out[(out["age"] >= 0) & (out["monthly_spend"] >= 0)]
 
     # For this reference, we fill missing region for stable downstream grouping.
-    out["region"] = out["region"].fillna("unknown")
+    out["region"] = fill_missing_region(out["region"])
 
     return out
 
@@ -54,6 +226,55 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
+def clean_customers_fused(df: pd.DataFrame) -> pd.DataFrame:
+    # Same rules as coerce_numeric_columns -> filter_invalid_rows -> build_features,
+    # but in one pass: one shared boolean mask, and the output frame is the only
+    # frame materialized. The caller's frame is never modified.
+    age = pd.to_numeric(df["age"], errors="coerce")
+    spend = pd.to_numeric(df["monthly_spend"], errors="coerce")
+    # NaN compares False and pd.NA maps to False, so this also drops missing values.
+    keep = (age.ge(0) & spend.ge(0)).to_numpy(dtype=bool, na_value=False)
+
+    columns = {}
+    for col in df.columns:
+        source = age if col == "age" else spend if col == "monthly_spend" else df[col]
+        columns[col] = source.array[keep]
+    out = pd.DataFrame(columns, index=df.index[keep], copy=False)
+
+    out["region"] = fill_missing_region(out["region"])
+    kept_age = out["age"].to_numpy(dtype=float)
+    kept_spend = out["monthly_spend"].to_numpy(dtype=float)
+    out["spend_per_age"] = np.divide(
+        kept_spend,
+        kept_age,
+        out=np.zeros(len(out), dtype=float),
+        where=kept_age != 0,
+    )
+    out["is_high_value"] = (kept_spend >= 250).astype(int)
+
+    return out
+
+
+def clean_customers(df: pd.DataFrame, mode: str = "copy", stages: StageRecorder = NO_STAGES) -> pd.DataFrame:
+    if mode == "fused":
+        with stages.stage("clean_customers_fused", rows_in=len(df)) as record:
+            out = clean_customers_fused(df)
+            record["rows_out"] = len(out)
+        return out
+    if mode != "copy":
+        raise ValueError(f"Unknown pipeline mode: {mode} (expected one of {PIPELINE_MODES})")
+    with stages.stage("coerce_numeric_columns", rows_in=len(df)) as record:
+        df_numeric = coerce_numeric_columns(df, NUMERIC_COLUMNS)
+        record["rows_out"] = len(df_numeric)
+    with stages.stage("filter_invalid_rows", rows_in=len(df_numeric)) as record:
+        df_valid = filter_invalid_rows(df_numeric)
+        record["rows_out"] = len(df_valid)
+    with stages.stage("build_features", rows_in=len(df_valid)) as record:
+        out = build_features(df_valid)
+        record["rows_out"] = len(out)
+    return out
+
+
 def generate_quality_report(df_raw: pd.DataFrame, df_clean: pd.DataFrame, duplicates_count: int) -> dict:
     input_rows = len(df_raw)
     output_rows = len(df_clean)
@@ -67,17 +288,263 @@ def generate_quality_report(df_raw: pd.DataFrame, df_clean: pd.DataFrame, duplic
     }
 
 
-def run_pipeline(input_csv: str) -> dict:
-    df_raw = load_customers(input_csv)
+def _value_hashes(values: pd.Series) -> np.ndarray:
+    # 64-bit hashes that agree across dtypes: anything that parses as a number
+    # hashes its float64 value, so 1, 1.0 and "1" collide, and the rest hashes
+    # its text. Nulls all hash alike, and + 0.0 folds -0.0 into 0.0.
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        return pd.util.hash_array(values.to_numpy(dtype=float, na_value=np.nan) + 0.0)
+    raw = values.to_numpy(dtype=object)
+    numbers = np.asarray(pd.to_numeric(raw, errors="coerce"), dtype=float)
+    hashes = pd.util.hash_array(numbers + 0.0)
+    text = np.isnan(numbers) & pd.notna(raw)
+    if text.any():
+        hashes[text] = pd.util.hash_array(raw[text])
+    return hashes
+
+
+def _number(value) -> float | None:
+    return None if value is None or np.isnan(value) else round(float(value), 6)
+
+
+def _numeric_values(df: pd.DataFrame, numeric: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    # One float matrix for every numeric column, plus how many non-null raw
+    # values failed to parse in each.
+    values = np.empty((len(df), len(numeric)), dtype=float)
+    raw_missing = np.empty((len(df), len(numeric)), dtype=bool)
+    for index, col in enumerate(numeric):
+        values[:, index] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        raw_missing[:, index] = df[col].isna().to_numpy()
+    invalid = (np.isnan(values) & ~raw_missing).sum(axis=0)
+    return values, invalid
+
+
+def _numeric_summary(values: np.ndarray) -> dict[str, np.ndarray]:
+    # Column-wise reductions over the whole matrix at once. All-NaN columns
+    # warn and yield NaN, which _number reports as null.
+    width = values.shape[1]
+    if len(values) == 0:
+        nan = np.full(width, np.nan)
+        return {"min": nan, "max": nan, "sum": np.zeros(width), "count": np.zeros(width, dtype=int)}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "min": np.nanmin(values, axis=0),
+            "max": np.nanmax(values, axis=0),
+            "sum": np.nansum(values, axis=0),
+            "count": (~np.isnan(values)).sum(axis=0),
+        }
+
+
+def _quantiles(values: np.ndarray) -> dict[str, float | None]:
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {f"p{round(q * 100):02d}": None for q in PROFILE_QUANTILES}
+    return {f"p{round(q * 100):02d}": _number(v) for q, v in zip(PROFILE_QUANTILES, np.quantile(values, PROFILE_QUANTILES))}
+
+
+def profile_customers(df: pd.DataFrame) -> dict:
+    # Exact profile of an in-memory frame: null and distinct counts for every
+    # column, plus parse failures, negatives and distribution stats for the
+    # numeric columns.
+    started = time.perf_counter()
+    numeric = [col for col in NUMERIC_COLUMNS if col in df.columns]
+    nulls = df.isna().to_numpy().sum(axis=0)
+    distinct = df.nunique(dropna=True)
+    values, invalid = _numeric_values(df, numeric)
+    summary = _numeric_summary(values)
+    negative = (values < 0).sum(axis=0)
+
+    columns = {}
+    for index, col in enumerate(df.columns):
+        columns[col] = {
+            "null_count": int(nulls[index]),
+            "null_rate": round(int(nulls[index]) / len(df), 6) if len(df) else 0.0,
+            "distinct": int(distinct[col]),
+        }
+    for index, col in enumerate(numeric):
+        count = int(summary["count"][index])
+        columns[col].update(
+            {
+                "invalid_count": int(invalid[index]),
+                "negative_count": int(negative[index]),
+                "min": _number(summary["min"][index]),
+                "max": _number(summary["max"][index]),
+                "mean": _number(summary["sum"][index] / count) if count else None,
+                "quantiles": _quantiles(values[:, index]),
+            }
+        )
+    return {"rows": len(df), "columns": columns, "profile_seconds": round(time.perf_counter() - started, 6)}
+
+
+def _bottom_k(keys: np.ndarray, size: int, *payload: np.ndarray) -> tuple[np.ndarray, ...]:
+    if len(keys) <= size:
+        return (keys, *payload)
+    keep = np.argpartition(keys, size - 1)[:size]
+    return (keys[keep], *(values[keep] for values in payload))
+
+
+class ProfileSketch:
+    # Mergeable, bounded-memory version of profile_customers for chunked or
+    # partitioned input. Counts, sums and extremes are exact. Distinct counts
+    # use k-minimum-values over 64-bit hashes, and quantiles come from a
+    # bottom-k uniform sample of each numeric column.
+    def __init__(self, size: int = SKETCH_SIZE, seed: int = 0) -> None:
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.seconds = 0.0
+        self.columns: list[str] = []
+        self.nulls: dict[str, int] = {}
+        self.hashes: dict[str, np.ndarray] = {}
+        self.numeric: dict[str, dict] = {}
+
+    def add(self, df: pd.DataFrame) -> None:
+        started = time.perf_counter()
+        chunk = ProfileSketch(self.size)
+        chunk.rows = len(df)
+        chunk.columns = list(df.columns)
+        nulls = df.isna().to_numpy().sum(axis=0)
+        for index, col in enumerate(df.columns):
+            chunk.nulls[col] = int(nulls[index])
+            # Normalised values, so 30, 30.0 and "30" hash alike whichever dtype a chunk inferred.
+            hashes = _value_hashes(df[col].dropna())
+            chunk.hashes[col] = np.unique(hashes)[: self.size]
+
+        numeric = [col for col in NUMERIC_COLUMNS if col in df.columns]
+        values, invalid = _numeric_values(df, numeric)
+        summary = _numeric_summary(values)
+        negative = (values < 0).sum(axis=0)
+        keys = self.rng.random(len(df))
+        for index, col in enumerate(numeric):
+            # Only parsed values are sampled, so the sample is full until it
+            # holds `count` values and quantiles are exact below that.
+            present = ~np.isnan(values[:, index])
+            sample_keys, sample = _bottom_k(keys[present], self.size, values[present, index])
+            chunk.numeric[col] = {
+                "invalid": int(invalid[index]),
+                "negative": int(negative[index]),
+                "count": int(summary["count"][index]),
+                "sum": float(summary["sum"][index]),
+                "min": float(summary["min"][index]),
+                "max": float(summary["max"][index]),
+                "keys": sample_keys,
+                "sample": sample,
+            }
+        self.merge(chunk)
+        self.seconds += time.perf_counter() - started
+
+    def merge(self, other: ProfileSketch) -> None:
+        self.rows += other.rows
+        self.seconds += other.seconds
+        for col in other.columns:
+            if col not in self.nulls:
+                self.columns.append(col)
+                self.nulls[col] = 0
+                self.hashes[col] = np.empty(0, dtype=np.uint64)
+            self.nulls[col] += other.nulls[col]
+            merged = np.union1d(self.hashes[col], other.hashes[col])
+            self.hashes[col] = merged[: self.size]
+        for col, theirs in other.numeric.items():
+            ours = self.numeric.get(col)
+            if ours is None:
+                self.numeric[col] = dict(theirs)
+                continue
+            keys, sample = _bottom_k(
+                np.concatenate([ours["keys"], theirs["keys"]]),
+                self.size,
+                np.concatenate([ours["sample"], theirs["sample"]]),
+            )
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                low = np.nanmin([ours["min"], theirs["min"]])
+                high = np.nanmax([ours["max"], theirs["max"]])
+            self.numeric[col] = {
+                "invalid": ours["invalid"] + theirs["invalid"],
+                "negative": ours["negative"] + theirs["negative"],
+                "count": ours["count"] + theirs["count"],
+                "sum": ours["sum"] + theirs["sum"],
+                "min": float(low),
+                "max": float(high),
+                "keys": keys,
+                "sample": sample,
+            }
+
+    def distinct(self, col: str) -> tuple[int, bool]:
+        hashes = self.hashes[col]
+        if len(hashes) < self.size:
+            return len(hashes), False
+        # KMV estimate: the k-th smallest of n uniform hashes sits near k / n.
+        return int((self.size - 1) * 2.0**64 / float(hashes[-1])), True
+
+    def result(self) -> dict:
+        columns = {}
+        for col in self.columns:
+            distinct, estimated = self.distinct(col)
+            columns[col] = {
+                "null_count": self.nulls[col],
+                "null_rate": round(self.nulls[col] / self.rows, 6) if self.rows else 0.0,
+                "distinct": distinct,
+                "distinct_estimated": estimated,
+            }
+        for col, stats in self.numeric.items():
+            columns[col].update(
+                {
+                    "invalid_count": stats["invalid"],
+                    "negative_count": stats["negative"],
+                    "min": _number(stats["min"]),
+                    "max": _number(stats["max"]),
+                    "mean": _number(stats["sum"] / stats["count"]) if stats["count"] else None,
+                    "quantiles": _quantiles(stats["sample"]),
+                    "quantiles_sampled": bool(stats["count"] > len(stats["sample"])),
+                }
+            )
+        return {"rows": self.rows, "columns": columns, "profile_seconds": round(self.seconds, 6)}
+
+
+def run_pipeline(
+    input_csv: str,
+    mode: str = "copy",
+    track_memory: bool = False,
+    project_columns: bool = False,
+    optimize_dtypes: bool = False,
+    profile: bool = False,
+    instrument: bool = False,
+) -> dict:
+    if track_memory:
+        tracemalloc.start()
+    stages = StageRecorder(enabled=instrument)
+
+    with stages.stage("load_customers") as record:
+        df_raw = load_customers(
+            input_csv,
+            columns=REQUIRED_COLUMNS if project_columns else None,
+            optimize=optimize_dtypes,
+        )
+        record["rows_out"] = len(df_raw)
     validate_required_columns(df_raw, REQUIRED_COLUMNS)
 
-    duplicates_count = int(df_raw.duplicated(subset=["user_id"]).sum())
+    with stages.stage("count_duplicates", rows_in=len(df_raw)):
+        duplicates_count = int(df_raw.duplicated(subset=["user_id"]).sum())
 
-    df_numeric = coerce_numeric_columns(df_raw, NUMERIC_COLUMNS)
-    df_valid = filter_invalid_rows(df_numeric)
-    df_features = build_features(df_valid)
+    df_features = clean_customers(df_raw, mode, stages)
 
     report = generate_quality_report(df_raw, df_features, duplicates_count)
+    report["pipeline_mode"] = mode
+    if profile:
+        with stages.stage("profile_customers", rows_in=len(df_raw)):
+            report["profile"] = profile_customers(df_raw)
+    if instrument:
+        # persist_outputs appends its own stage before writing the report.
+        report["stages"] = stages.stages
+
+    if track_memory:
+        report["input_memory_mb"] = memory_report(df_raw)
+        # NumPy/pandas buffers are reported to tracemalloc, so this is the
+        # peak of everything the pipeline held at once.
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["peak_memory_mb"] = round(peak / 1024**2, 3)
 
     return {
         "clean_df": df_features,
@@ -85,24 +552,497 @@ def run_pipeline(input_csv: str) -> dict:
     }
 
 
-def persist_outputs(result: dict, output_dir: str) -> None:
+def iter_customer_chunks(csv_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    path = Path(csv_path)
+    if not path.exists():
+        raise ValueError(f"Input CSV not found: {path}")
+    if detect_format(path) != "csv":
+        raise ValueError(f"Streaming mode reads CSV input; got {path.name}")
+    # user_id is read as text so every chunk writes it the same way, even when
+    # one chunk happens to contain missing ids and would otherwise infer floats.
+    empty = True
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype={"user_id": str}):
+        empty = False
+        yield chunk
+    if empty:
+        # Header-only file: still yield one empty frame so the output gets its columns.
+        yield pd.read_csv(path, nrows=0, dtype={"user_id": str})
+
+
+class DuplicateCounter:
+    # Counts repeated `user_id` values across chunks with bounded memory: each id
+    # becomes a 64-bit hash appended to one of `partitions` spill files, and
+    # duplicates are counted one partition at a time.
+    def __init__(self, spill_dir: Path, partitions: int = 64) -> None:
+        self.spill_dir = spill_dir
+        self.partitions = partitions
+
+    def add(self, user_ids: pd.Series) -> None:
+        hashes = _value_hashes(user_ids)
+        buckets = hashes % np.uint64(self.partitions)
+        for bucket in np.unique(buckets):
+            with (self.spill_dir / f"ids_{bucket:04d}.bin").open("ab") as handle:
+                hashes[buckets == bucket].tofile(handle)
+
+    def count(self) -> int:
+        duplicates = 0
+        for spill_file in sorted(self.spill_dir.glob("ids_*.bin")):
+            hashes = np.fromfile(spill_file, dtype=np.uint64)
+            duplicates += len(hashes) - len(np.unique(hashes))
+        return int(duplicates)
+
+
+def run_pipeline_streaming(
+    input_csv: str,
+    output_dir: str,
+    chunksize: int = 100_000,
+    mode: str = "copy",
+    profile: bool = False,
+) -> dict:
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
-
     clean_csv = out_dir / "customers_clean.csv"
     report_json = out_dir / "quality_report.json"
 
-    result["clean_df"].to_csv(clean_csv, index=False)
+    input_rows = 0
+    output_rows = 0
+    output_columns: list[str] | None = None
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as spill_dir:
+        duplicates = DuplicateCounter(Path(spill_dir))
+        sketch = ProfileSketch() if profile else None
+        for index, chunk in enumerate(iter_customer_chunks(input_csv, chunksize)):
+            if index == 0:
+                validate_required_columns(chunk, REQUIRED_COLUMNS)
+            duplicates.add(chunk["user_id"])
+            if sketch is not None:
+                sketch.add(chunk)
+
+            clean = clean_customers(chunk, mode)
+            clean.to_csv(clean_csv, mode="w" if index == 0 else "a", header=index == 0, index=False)
+
+            input_rows += len(chunk)
+            output_rows += len(clean)
+            if output_columns is None:
+                output_columns = list(clean.columns)
+
+        duplicates_count = duplicates.count()
+
+    report = {
+        "input_rows": input_rows,
+        "output_rows": output_rows,
+        "dropped_rows": input_rows - output_rows,
+        "duplicates_count": duplicates_count,
+        "output_columns": output_columns or [],
+        "pipeline_mode": mode,
+    }
+    if sketch is not None:
+        report["profile"] = sketch.result()
+    report_json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    return {
+        "clean_csv": str(clean_csv),
+        "quality_report": report,
+    }
+
+
+def hash_user_ids(user_ids: pd.Series) -> np.ndarray:
+    # Ids compare equal across files whose user_id column was inferred as int
+    # in one, float (because of a missing id) in another and str in a third.
+    return _value_hashes(user_ids)
+
+
+def plan_partitions(input_paths: list[str], workers: int) -> list[tuple[str, tuple[int, ...] | None]]:
+    # One task per file. With fewer files than workers, Parquet files are also
+    # split into contiguous row-group ranges so every worker gets a share.
+    # CSV has no cheap split points, so each CSV file stays one task.
+    splits_per_file = max(1, -(-workers // max(1, len(input_paths))))
+    tasks: list[tuple[str, tuple[int, ...] | None]] = []
+    for input_path in input_paths:
+        path = Path(input_path)
+        if not path.exists():
+            raise ValueError(f"Input file not found: {path}")
+        if detect_format(path) != "parquet" or splits_per_file == 1:
+            tasks.append((str(path), None))
+            continue
+        import pyarrow.parquet as pq
+
+        row_groups = np.arange(pq.ParquetFile(path).num_row_groups)
+        for group_range in np.array_split(row_groups, min(splits_per_file, max(1, len(row_groups)))):
+            tasks.append((str(path), tuple(int(group) for group in group_range)))
+    return tasks
+
+
+def load_partition(
+    input_path: str,
+    row_groups: tuple[int, ...] | None,
+    columns: Iterable[str] | None,
+    optimize: bool = False,
+) -> pd.DataFrame:
+    if row_groups is None:
+        return load_customers(input_path, columns=columns, optimize=optimize)
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(input_path, read_dictionary=["region"])
+    if columns is not None:
+        requested = set(columns)
+        columns = [col for col in parquet_file.schema_arrow.names if col in requested]
+    df = parquet_file.read_row_groups(list(row_groups), columns=columns).to_pandas()
+    return optimize_dtypes(df) if optimize else df
+
+
+def concat_partitions(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # pd.concat falls back to object when category sets differ between parts,
+    # so align them to the union first.
+    for col in frames[0].columns:
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = frames[0][col].cat.categories
+            for frame in frames[1:]:
+                categories = categories.union(frame[col].cat.categories)
+            frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _clean_partition(
+    task: tuple[str, tuple[int, ...] | None, str, bool, bool, bool],
+) -> tuple[pd.DataFrame, int, np.ndarray, ProfileSketch | None]:
+    input_path, row_groups, mode, project_columns, optimize, profile = task
+    df_raw = load_partition(input_path, row_groups, REQUIRED_COLUMNS if project_columns else None, optimize)
+    validate_required_columns(df_raw, REQUIRED_COLUMNS)
+    sketch = None
+    if profile:
+        # Seeded from the task, so the sampled quantiles are reproducible.
+        sketch = ProfileSketch(seed=zlib.crc32(f"{input_path}:{row_groups}".encode()))
+        sketch.add(df_raw)
+    # Only hashes leave the worker for dedup; duplicates can span partitions.
+    return clean_customers(df_raw, mode), len(df_raw), hash_user_ids(df_raw["user_id"]), sketch
+
+
+def run_pipeline_partitioned(
+    input_paths: list[str],
+    workers: int | None = None,
+    mode: str = "copy",
+    project_columns: bool = False,
+    optimize_dtypes: bool = False,
+    profile: bool = False,
+) -> dict:
+    workers = workers or os.cpu_count() or 1
+    tasks = plan_partitions(input_paths, workers)
+    payloads = [(path, groups, mode, project_columns, optimize_dtypes, profile) for path, groups in tasks]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        parts = list(pool.map(_clean_partition, payloads))
+
+    # Merge in task order, so the output row order matches a sequential run.
+    df_features = concat_partitions([clean for clean, _, _, _ in parts])
+    input_rows = sum(rows for _, rows, _, _ in parts)
+    hashes = np.concatenate([ids for _, _, ids, _ in parts])
+    duplicates_count = int(len(hashes) - len(np.unique(hashes)))
+
+    report = {
+        "input_rows": input_rows,
+        "output_rows": len(df_features),
+        "dropped_rows": input_rows - len(df_features),
+        "duplicates_count": duplicates_count,
+        "output_columns": list(df_features.columns),
+        "pipeline_mode": mode,
+        "partitions": len(tasks),
+        "workers": min(workers, len(tasks)),
+    }
+    if profile:
+        sketch = ProfileSketch()
+        for *_, part_sketch in parts:
+            sketch.merge(part_sketch)
+        report["profile"] = sketch.result()
+
+    return {
+        "clean_df": df_features,
+        "quality_report": report,
+    }
+
+
+def file_fingerprint(path: Path, previous: dict | None = None) -> dict:
+    # Unchanged size and mtime reuse the stored hash, so unchanged files are
+    # never re-read; a touched-but-identical file still matches on sha256.
+    stat = path.stat()
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": previous["sha256"]}
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+def _write_atomically(path: Path, write) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_array(path: Path, values: np.ndarray) -> None:
+    # np.save would append ".npy" to the temporary name, so hand it a handle.
+    with path.open("wb") as handle:
+        np.save(handle, values)
+
+
+def run_pipeline_incremental(
+    input_paths: list[str],
+    output_dir: str,
+    workers: int | None = None,
+    mode: str = "copy",
+    project_columns: bool = False,
+    optimize_dtypes: bool = False,
+    output_format: str = "csv",
+) -> dict:
+    # Each input file is one partition with its own output part in
+    # output_dir/customers_clean/. A part is recomputed and rewritten only when
+    # its file's content hash, PIPELINE_VERSION or the cleaning settings
+    # change. Row counts come from the manifest, so unchanged parts are never
+    # read back; only their user_id hashes are, for the global duplicate count.
+    if output_format not in OUTPUT_SUFFIXES:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    out_dir = Path(output_dir)
+    cache_dir = out_dir / INCREMENTAL_DIR
+    parts_dir = out_dir / "customers_clean"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = cache_dir / "manifest.json"
+    settings = {
+        "pipeline_version": PIPELINE_VERSION,
+        "mode": mode,
+        "project_columns": project_columns,
+        "optimize_dtypes": optimize_dtypes,
+        "output_format": output_format,
+    }
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    previous = manifest.get("files", {}) if manifest.get("settings") == settings else {}
+
+    entries: dict[str, dict] = {}
+    stale: list[str] = []
+    for input_path in input_paths:
+        path = Path(input_path).resolve()
+        if not path.exists():
+            raise ValueError(f"Input file not found: {path}")
+        key = str(path)
+        old = previous.get(key)
+        fingerprint = file_fingerprint(path, old)
+        stem = hashlib.sha256(key.encode()).hexdigest()[:16]
+        entry = {**fingerprint, "part": f"part-{stem}{OUTPUT_SUFFIXES[output_format]}", "ids": f"{stem}.npy"}
+        cached = (
+            old is not None
+            and old["sha256"] == fingerprint["sha256"]
+            and (parts_dir / entry["part"]).exists()
+            and (cache_dir / entry["ids"]).exists()
+        )
+        if cached:
+            for field in ("input_rows", "output_rows", "output_columns"):
+                entry[field] = old[field]
+        else:
+            stale.append(key)
+        entries[key] = entry
+
+    payloads = [(key, None, mode, project_columns, optimize_dtypes, False) for key in stale]
+    if workers is None or len(stale) <= 1:
+        computed = map(_clean_partition, payloads)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(stale)))
+        computed = pool.map(_clean_partition, payloads)
+    try:
+        for key, (clean, rows, ids, _) in zip(stale, computed):
+            entry = entries[key]
+            _write_atomically(parts_dir / entry["part"], lambda tmp: write_clean(clean, tmp, output_format))
+            _write_atomically(cache_dir / entry["ids"], lambda tmp: _save_array(tmp, ids))
+            entry.update(input_rows=rows, output_rows=len(clean), output_columns=list(clean.columns))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Drop the parts and hashes of files that are no longer inputs.
+    kept = {name for entry in entries.values() for name in (entry["part"], entry["ids"])}
+    for stale_file in [*parts_dir.glob("part-*"), *cache_dir.glob("*.npy"), *cache_dir.glob("*.parquet")]:
+        if stale_file.name not in kept:
+            stale_file.unlink()
+    _write_atomically(
+        manifest_path,
+        lambda tmp: tmp.write_text(json.dumps({"settings": settings, "files": entries}, indent=2), encoding="utf-8"),
+    )
+
+    ordered = [entries[str(Path(input_path).resolve())] for input_path in input_paths]
+    input_rows = sum(entry["input_rows"] for entry in ordered)
+    output_rows = sum(entry["output_rows"] for entry in ordered)
+    hashes = np.concatenate([np.load(cache_dir / entry["ids"]) for entry in ordered])
+    duplicates_count = int(len(hashes) - len(np.unique(hashes)))
+
+    report = {
+        "input_rows": input_rows,
+        "output_rows": output_rows,
+        "dropped_rows": input_rows - output_rows,
+        "duplicates_count": duplicates_count,
+        "output_columns": ordered[0]["output_columns"] if ordered else [],
+        "pipeline_mode": mode,
+        "partitions": len(ordered),
+        "recomputed_partitions": len(stale),
+        "reused_partitions": len(ordered) - len(stale),
+        # Part files in input order; reading them in this order gives the full output.
+        "parts": [entry["part"] for entry in ordered],
+    }
+    (out_dir / "quality_report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    return {
+        "clean_dir": str(parts_dir),
+        "quality_report": report,
+    }
+
+
+def write_clean(df: pd.DataFrame, path: Path, output_format: str) -> None:
+    if output_format == "csv":
+        df.to_csv(path, index=False)
+    elif output_format == "parquet":
+        apply_columnar_dtypes(df).to_parquet(path, index=False)
+    else:
+        apply_columnar_dtypes(df).reset_index(drop=True).to_feather(path)
+
+
+def persist_outputs(result: dict, output_dir: str, output_format: str = "csv") -> None:
+    if output_format not in OUTPUT_SUFFIXES:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    clean_path = out_dir / f"customers_clean{OUTPUT_SUFFIXES[output_format]}"
+    report_json = out_dir / "quality_report.json"
+
+    report = result["quality_report"]
+    stages = StageRecorder(enabled="stages" in report)
+    with stages.stage("persist_outputs", rows_in=len(result["clean_df"])) as record:
+        write_clean(result["clean_df"], clean_path, output_format)
+        record["rows_out"] = len(result["clean_df"])
+    if stages.enabled:
+        report["stages"] = [*report["stages"], *stages.stages]
     report_json.write_text(json.dumps(result["quality_report"], indent=2), encoding="utf-8")
 
 
-if __name__ == "__main__":
+def parse_args() -> argparse.Namespace:
     base = Path(__file__).resolve().parent
-    input_csv = base / "sample" / "data" / "customers_raw.csv"
-    output_dir = base / "sample" / "output"
+    parser = argparse.ArgumentParser(description="Clean the customer export.")
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        default=[str(base / "sample" / "data" / "customers_raw.csv")],
+        help="Input file(s); more than one needs --workers.",
+    )
+    parser.add_argument("--output-dir", default=str(base / "sample" / "output"))
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the input in chunks of this many rows instead of loading it whole.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=PIPELINE_MODES,
+        default="copy",
+        help="copy: one DataFrame copy per stage; fused: single pass with one output frame.",
+    )
+    parser.add_argument(
+        "--track-memory",
+        action="store_true",
+        help="Record peak traced memory in the quality report (in-memory mode only).",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=tuple(OUTPUT_SUFFIXES),
+        default="csv",
+        help="File type for customers_clean (input type is detected from its extension).",
+    )
+    parser.add_argument(
+        "--project",
+        action="store_true",
+        help="Read only the required columns from the input.",
+    )
+    parser.add_argument(
+        "--optimize-dtypes",
+        action="store_true",
+        help="Load with downcast numerics, categoricals and pyarrow strings.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Clean files / Parquet row-group ranges in this many processes (0 = all cores).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Add a per-column data-quality profile to the report (sketched in --chunksize/--workers modes).",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Record wall/CPU time, rows in/out and peak-RSS growth per stage (in-memory mode only).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Write one output part per input file and only recompute and rewrite changed files.",
+    )
+    args = parser.parse_args()
+    if args.workers is None and not args.incremental and len(args.input) > 1:
+        parser.error("several --input files need --workers or --incremental")
+    if args.chunksize and (args.workers is not None or args.incremental):
+        parser.error("--chunksize cannot be combined with --workers or --incremental")
+    if args.instrument and (args.chunksize or args.workers is not None or args.incremental):
+        parser.error("--instrument covers the in-memory mode only")
+    if args.profile and args.incremental:
+        parser.error("--profile needs the raw rows, which --incremental does not reload")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
 
-    result = run_pipeline(str(input_csv))
-    persist_outputs(result, str(output_dir))
+    if args.chunksize:
+        result = run_pipeline_streaming(
+            args.input[0],
+            args.output_dir,
+            chunksize=args.chunksize,
+            mode=args.mode,
+            profile=args.profile,
+        )
+    elif args.incremental:
+        result = run_pipeline_incremental(
+            args.input,
+            args.output_dir,
+            workers=args.workers,
+            mode=args.mode,
+            project_columns=args.project,
+            optimize_dtypes=args.optimize_dtypes,
+            output_format=args.output_format,
+        )
+    elif args.workers is not None:
+        result = run_pipeline_partitioned(
+            args.input,
+            workers=args.workers,
+            mode=args.mode,
+            project_columns=args.project,
+            optimize_dtypes=args.optimize_dtypes,
+            profile=args.profile,
+        )
+        persist_outputs(result, args.output_dir, output_format=args.output_format)
+    else:
+        result = run_pipeline(
+            args.input[0],
+            mode=args.mode,
+            track_memory=args.track_memory,
+            project_columns=args.project,
+            optimize_dtypes=args.optimize_dtypes,
+            profile=args.profile,
+            instrument=args.instrument,
+        )
+        persist_outputs(result, args.output_dir, output_format=args.output_format)
 
     print("Pipeline completed")
     print(json.dumps(result["quality_report"], indent=2))
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+def make_customers(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    age = rng.integers(-5, 90, size=rows).astype(float)
+    age[rng.random(rows) < 0.01] = np.nan
+    region = rng.choice(np.array(["north", "south", "east", "west"], dtype=object), size=rows)
+    region[rng.random(rows) < 0.02] = None
+    return pd.DataFrame(
+        {
+            "user_id": rng.integers(0, rows, size=rows),
+            "age": age,
+            "monthly_spend": rng.gamma(2.0, 80.0, size=rows).round(2) - 5,
+            "region": region,
+            "signup_channel": rng.choice(["web", "app", "store"], size=rows),
+            "notes": "imported",
+        }
+    )
+
+
+def timed(fn) -> tuple[float, object]:
+    started = time.perf_counter()
+    value = fn()
+    return time.perf_counter() - started, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CSV vs Parquet vs Feather for the customer pipeline.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    solutions = load_solutions()
+    df = make_customers(args.rows)
+    results: dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        writers = {
+            "csv": lambda path: df.to_csv(path, index=False),
+            "parquet": lambda path: solutions.apply_columnar_dtypes(df).to_parquet(path, index=False),
+            "feather": lambda path: solutions.apply_columnar_dtypes(df).to_feather(path),
+        }
+        for file_format, write in writers.items():
+            path = tmp_dir / f"customers{solutions.OUTPUT_SUFFIXES[file_format]}"
+            write_seconds, _ = timed(lambda: write(path))
+            read_seconds, _ = timed(lambda: solutions.load_customers(str(path)))
+            projected_seconds, _ = timed(
+                lambda: solutions.load_customers(str(path), columns=solutions.REQUIRED_COLUMNS)
+            )
+            pipeline_seconds, result = timed(
+                lambda: solutions.run_pipeline(str(path), mode="fused", project_columns=True)
+            )
+            results[file_format] = {
+                "file_mb": round(path.stat().st_size / 1024**2, 2),
+                "write_seconds": round(write_seconds, 3),
+                "read_seconds": round(read_seconds, 3),
+                "read_projected_seconds": round(projected_seconds, 3),
+                "pipeline_seconds": round(pipeline_seconds, 3),
+                "output_rows": result["quality_report"]["output_rows"],
+            }
+            print(file_format, results[file_format])
+
+    report = {"rows": args.rows, "results": results}
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
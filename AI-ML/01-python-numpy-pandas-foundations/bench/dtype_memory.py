@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+def write_customers(path: Path, rows: int, seed: int = 5) -> None:
+    rng = np.random.default_rng(seed)
+    age = rng.integers(0, 90, size=rows).astype(float)
+    age[rng.random(rows) < 0.01] = np.nan
+    region = rng.choice(np.array(["north", "south", "east", "west"], dtype=object), size=rows)
+    region[rng.random(rows) < 0.02] = None
+    pd.DataFrame(
+        {
+            "user_id": rng.integers(0, rows, size=rows),
+            "age": age,
+            "monthly_spend": rng.gamma(2.0, 80.0, size=rows).round(2),
+            "region": region,
+            "email": [f"user{i}@example.com" for i in rng.integers(0, rows, size=rows)],
+        }
+    ).to_csv(path, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DataFrame memory with default vs optimized dtypes.")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    solutions = load_solutions()
+    report: dict = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "customers.csv"
+        write_customers(path, args.rows)
+        for label, optimize in (("default", False), ("optimized", True)):
+            started = time.perf_counter()
+            df = solutions.load_customers(str(path), optimize=optimize)
+            report[label] = {
+                "load_seconds": round(time.perf_counter() - started, 3),
+                "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+                "memory_mb": solutions.memory_report(df),
+            }
+            del df
+
+    report["reduction"] = round(
+        report["default"]["memory_mb"]["total"] / report["optimized"]["memory_mb"]["total"], 2
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
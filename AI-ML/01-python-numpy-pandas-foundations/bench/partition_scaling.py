@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+def write_customers(path: Path, rows: int, row_group_size: int, seed: int = 11) -> None:
+    rng = np.random.default_rng(seed)
+    age = rng.integers(-5, 90, size=rows).astype(float)
+    age[rng.random(rows) < 0.01] = np.nan
+    df = pd.DataFrame(
+        {
+            "user_id": rng.integers(0, rows, size=rows),
+            "age": age,
+            "monthly_spend": rng.gamma(2.0, 80.0, size=rows).round(2) - 5,
+            "region": rng.choice(["north", "south", "east", "west"], size=rows),
+        }
+    )
+    df.to_parquet(path, index=False, row_group_size=row_group_size)
+
+
+def worker_counts(max_workers: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput of run_pipeline_partitioned by worker count.")
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--row-group-size", type=int, default=250_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mode", default="fused")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    solutions = load_solutions()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "customers.parquet"
+        write_customers(path, args.rows, args.row_group_size)
+
+        started = time.perf_counter()
+        baseline = solutions.run_pipeline(str(path), mode=args.mode)
+        results.append({"workers": 0, "seconds": round(time.perf_counter() - started, 3)})
+        print(results[-1])
+
+        for workers in worker_counts(args.max_workers):
+            started = time.perf_counter()
+            result = solutions.run_pipeline_partitioned([str(path)], workers=workers, mode=args.mode)
+            seconds = time.perf_counter() - started
+            for key in ("output_rows", "duplicates_count"):
+                if result["quality_report"][key] != baseline["quality_report"][key]:
+                    raise SystemExit(f"{key} differs from run_pipeline at {workers} workers")
+            results.append(
+                {
+                    "workers": workers,
+                    "partitions": result["quality_report"]["partitions"],
+                    "seconds": round(seconds, 3),
+                    "rows_per_second": round(args.rows / seconds),
+                }
+            )
+            print(results[-1])
+
+    single = next(r["seconds"] for r in results if r["workers"] == 1)
+    for row in results[1:]:
+        row["speedup_vs_1_worker"] = round(single / row["seconds"], 2)
+    report = {"rows": args.rows, "row_group_size": args.row_group_size, "results": results}
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
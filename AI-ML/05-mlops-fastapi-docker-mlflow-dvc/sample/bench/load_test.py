@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+SAMPLE_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = SAMPLE_DIR / "bench" / "results"
+SCENARIOS = ("predict", "batch-json", "batch-npy")
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the inference API.")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per scenario.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds per scenario.")
+    parser.add_argument("--batch-rows", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn --workers (uvicorn mode only).")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--set",
+        dest="env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Environment override for the API, e.g. --set MICROBATCH_ENABLED=false.",
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result JSON to diff against.")
+    return parser.parse_args()
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SAMPLE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def proc_cpu_seconds(pid: int) -> float:
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return 0.0
+    # utime and stime are fields 14 and 15; index 0 here is field 3 (state).
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+
+def child_pids(pid: int) -> list[int]:
+    children: list[int] = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            child = int(stat.parent.name)
+            children.append(child)
+            children.extend(child_pids(child))
+    return children
+
+
+def tree_cpu_seconds(pid: int) -> float:
+    return sum(proc_cpu_seconds(p) for p in [pid, *child_pids(pid)])
+
+
+def proc_memory_mb(pid: int) -> dict[str, float]:
+    # RssFile counts shared file-backed pages (mmapped models, libraries);
+    # Pss splits shared pages across the processes mapping them.
+    fields: dict[str, float] = {}
+    for source, keys in (
+        (f"/proc/{pid}/status", {"VmRSS": "rss", "RssAnon": "rss_anon", "RssFile": "rss_file"}),
+        (f"/proc/{pid}/smaps_rollup", {"Pss": "pss"}),
+    ):
+        try:
+            lines = Path(source).read_text().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            key, _, value = line.partition(":")
+            if key in keys:
+                fields[keys[key]] = round(int(value.split()[0]) / 1024, 2)
+    return fields
+
+
+def tree_memory_mb(pid: int) -> dict[str, dict[str, float]]:
+    return {str(p): proc_memory_mb(p) for p in [pid, *child_pids(pid)]}
+
+
+def make_request_factory(scenario: str, batch_rows: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    # Roughly iris-shaped feature ranges.
+    low = np.array([4.3, 2.0, 1.0, 0.1])
+    high = np.array([7.9, 4.4, 6.9, 2.5])
+    pool = rng.uniform(low, high, size=(4096, 4)).round(2)
+
+    if scenario == "predict":
+        rows = pool.tolist()
+
+        def build(i: int) -> tuple[str, dict, int]:
+            return "/predict", {"json": {"features": rows[i % len(rows)]}}, 1
+
+    elif scenario == "batch-json":
+        payloads = [
+            {"features": pool[np.arange(k, k + batch_rows) % len(pool)].tolist()} for k in range(0, len(pool), 64)
+        ]
+
+        def build(i: int) -> tuple[str, dict, int]:
+            return "/predict/batch", {"json": payloads[i % len(payloads)]}, batch_rows
+
+    else:
+        bodies = []
+        for k in range(0, len(pool), 64):
+            buf = io.BytesIO()
+            np.save(buf, pool[np.arange(k, k + batch_rows) % len(pool)])
+            bodies.append(buf.getvalue())
+        headers = {"content-type": "application/x-npy"}
+
+        def build(i: int) -> tuple[str, dict, int]:
+            return "/predict/batch", {"content": bodies[i % len(bodies)], "headers": headers}, batch_rows
+
+    return build
+
+
+async def drive(client: httpx.AsyncClient, scenario: str, args: argparse.Namespace, server_pid: int | None) -> dict:
+    build = make_request_factory(scenario, args.batch_rows)
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    rows_done = 0
+    counter = 0
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + args.warmup
+    stop_at = measure_from + args.duration
+
+    async def worker() -> None:
+        nonlocal rows_done, counter
+        while True:
+            now = loop.time()
+            if now >= stop_at:
+                return
+            counter += 1
+            url, kwargs, n_rows = build(counter)
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            elapsed = time.perf_counter() - started
+            if now >= measure_from:
+                latencies.append(elapsed)
+                statuses[status] += 1
+                if status == 200:
+                    rows_done += n_rows
+
+    workers = asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    await asyncio.sleep(max(0.0, measure_from - loop.time()))
+    cpu_start = tree_cpu_seconds(server_pid) if server_pid else time.process_time()
+    memory_before = tree_memory_mb(server_pid or os.getpid())
+    wall_start = time.perf_counter()
+    await workers
+    wall = time.perf_counter() - wall_start
+    cpu_used = (tree_cpu_seconds(server_pid) if server_pid else time.process_time()) - cpu_start
+    memory_after = tree_memory_mb(server_pid or os.getpid())
+
+    ok = statuses.get(200, 0)
+    lat_ms = np.array(latencies) * 1000 if latencies else np.array([0.0])
+    return {
+        "scenario": scenario,
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": len(latencies) - ok,
+        "status_counts": {str(k): v for k, v in sorted(statuses.items())},
+        "wall_seconds": round(wall, 3),
+        "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "rows_per_second": round(rows_done / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(float(np.percentile(lat_ms, 50)), 3),
+            "p95": round(float(np.percentile(lat_ms, 95)), 3),
+            "p99": round(float(np.percentile(lat_ms, 99)), 3),
+            "max": round(float(lat_ms.max()), 3),
+            "mean": round(float(lat_ms.mean()), 3),
+        },
+        # In-process mode measures this process (client + server), uvicorn mode the server tree only.
+        "cpu_seconds": round(cpu_used, 3),
+        "cpu_cores_used": round(cpu_used / wall, 3) if wall else 0.0,
+        # Keyed by pid: the uvicorn supervisor plus one entry per worker process.
+        "memory_mb": {"before": memory_before, "after": memory_after},
+    }
+
+
+def apply_env(pairs: list[str]) -> dict[str, str]:
+    overrides: dict[str, str] = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--set expects KEY=VALUE, got {pair!r}")
+        overrides[key.strip()] = value
+    return overrides
+
+
+async def run_inprocess(args: argparse.Namespace, scenarios: list[str]) -> list[dict]:
+    sys.path.insert(0, str(SAMPLE_DIR))
+    from src.api import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                results.append(await drive(client, scenario, args, server_pid=None))
+    return results
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/health")
+            if response.status_code == 200 and response.json()["model"]["loaded"]:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not become healthy in time")
+
+
+async def run_uvicorn(args: argparse.Namespace, scenarios: list[str], env: dict[str, str]) -> list[dict]:
+    cmd = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "src.api:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    server = subprocess.Popen(cmd, cwd=SAMPLE_DIR, env={**os.environ, **env})
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+            await wait_until_healthy(client)
+            return [await drive(client, scenario, args, server_pid=server.pid) for scenario in scenarios]
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def print_comparison(current: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    previous = {row["scenario"]: row for row in baseline["results"]}
+    print(f"Compared with {baseline_path} (commit {baseline.get('git_commit')}):")
+    for row in current["results"]:
+        old = previous.get(row["scenario"])
+        if old is None:
+            continue
+        rps_delta = (row["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+        p99_delta = row["latency_ms"]["p99"] - old["latency_ms"]["p99"]
+        print(f"  {row['scenario']:<11} rps {rps_delta:+7.1f}%   p99 {p99_delta:+8.3f} ms")
+
+
+def main() -> None:
+    args = parse_args()
+    scenarios = args.scenario or list(SCENARIOS)
+    env = apply_env(args.env)
+
+    model_path = Path(env.get("MODEL_PATH", os.getenv("MODEL_PATH", "models/model.joblib")))
+    if not model_path.is_absolute():
+        model_path = SAMPLE_DIR / model_path
+    if not model_path.exists():
+        raise SystemExit(f"Model not found at {model_path}; run `python src/train.py` first.")
+
+    if args.mode == "inprocess":
+        os.environ.update(env)
+        results = asyncio.run(run_inprocess(args, scenarios))
+    else:
+        results = asyncio.run(run_uvicorn(args, scenarios, env))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "mode": args.mode,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "batch_rows": args.batch_rows,
+            "workers": args.workers if args.mode == "uvicorn" else 1,
+            "env": env,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['git_commit'] or 'nogit'}-{args.mode}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for row in results:
+        lat = row["latency_ms"]
+        print(
+            f"{row['scenario']:<11} rps={row['rps']:>9.1f} rows/s={row['rows_per_second']:>11.1f} "
+            f"p50={lat['p50']:.2f}ms p95={lat['p95']:.2f}ms p99={lat['p99']:.2f}ms "
+            f"errors={row['errors']} cpu={row['cpu_cores_used']:.2f} cores"
+        )
+        for pid, after in row["memory_mb"]["after"].items():
+            before = row["memory_mb"]["before"].get(pid, {})
+            print(
+                f"  pid {pid:>7} rss {before.get('rss', 0):8.1f} -> {after.get('rss', 0):8.1f} MB"
+                f"  pss {after.get('pss', 0):8.1f} MB  shared file {after.get('rss_file', 0):8.1f} MB"
+            )
+    print(f"Saved {output}")
+
+    if args.compare is not None:
+        print_comparison(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import mlflow
+from mlflow.tracking import MlflowClient
+
+SAMPLE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SAMPLE_DIR / "src"))
+
+from mlflow_batch import BatchedMlflowLogger  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-call vs batched MLflow metric logging.")
+    parser.add_argument("--metrics", type=int, default=10_000)
+    parser.add_argument("--output", type=Path, default=None)
+    return parser.parse_args()
+
+
+def per_call(n: int) -> float:
+    with mlflow.start_run(run_name="per_call"):
+        started = time.perf_counter()
+        for step in range(n):
+            mlflow.log_metric("loss", 1.0 / (step + 1), step=step)
+        return time.perf_counter() - started
+
+
+def batched(n: int) -> tuple[float, float, int]:
+    with mlflow.start_run(run_name="batched") as run:
+        started = time.perf_counter()
+        with BatchedMlflowLogger(MlflowClient()) as logger:
+            for step in range(n):
+                logger.log_metric(run.info.run_id, "loss", 1.0 / (step + 1), step=step)
+            enqueue_seconds = time.perf_counter() - started
+        # Leaving the `with` block flushed everything, so this is end-to-end time.
+        return enqueue_seconds, time.perf_counter() - started, logger.batches_sent
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tracking_dir:
+        mlflow.set_tracking_uri(Path(tracking_dir).as_uri())
+        mlflow.set_experiment("logging_benchmark")
+
+        per_call_seconds = per_call(args.metrics)
+        enqueue_seconds, batched_seconds, batches = batched(args.metrics)
+
+        history = MlflowClient().get_metric_history(mlflow.last_active_run().info.run_id, "loss")
+        if len(history) != args.metrics:
+            raise SystemExit(f"Batched run stored {len(history)} of {args.metrics} metrics")
+
+    report = {
+        "metrics": args.metrics,
+        "per_call_seconds": round(per_call_seconds, 3),
+        "batched_enqueue_seconds": round(enqueue_seconds, 3),
+        "batched_total_seconds": round(batched_seconds, 3),
+        "batched_log_batch_calls": batches,
+        "speedup": round(per_call_seconds / batched_seconds, 1) if batched_seconds else None,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,271 @@
 from __future__ import annotations
 
-from pathlib import Path
+import asyncio
+import contextlib
+import io
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated
 
-import joblib
 import numpy as np
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request, Response
+from pydantic import BaseModel, Field, ValidationError
+
+from .batching import MicroBatcher
+from .cache import PredictionCache
+from .config import load_settings
+from .inference import InferenceExecutor, QueueFullError
+from .metrics import MetricsRegistry
+from .registry import ModelRegistry
+
+
+N_FEATURES = 4
+NPY_CONTENT_TYPE = "application/x-npy"
+
+FeatureRow = Annotated[list[float], Field(min_length=N_FEATURES, max_length=N_FEATURES)]
 
 
 class PredictRequest(BaseModel):
-    features: list[float] = Field(..., min_length=4, max_length=4)
+    features: FeatureRow
 
 
 class PredictResponse(BaseModel):
     prediction: int
+    model_version: str
+
 
+class BatchPredictRequest(BaseModel):
+    features: list[FeatureRow] = Field(..., min_length=1)
+    return_proba: bool = False
 
-BASE_DIR = Path(__file__).resolve().parents[1]
-MODEL_PATH = BASE_DIR / "models" / "model.joblib"
 
-app = FastAPI(title="AI-ML FastAPI Inference", version="1.0.0")
+class BatchPredictResponse(BaseModel):
+    predictions: list[int]
+    probabilities: list[list[float]] | None = None
+    model_version: str
+    count: int
 
 
-def load_model():
-    if not MODEL_PATH.exists():
-        raise RuntimeError(f"Model file not found: {MODEL_PATH}")
-    return joblib.load(MODEL_PATH)
+settings = load_settings()
+MODEL_PATH = settings.model_path
+registry = ModelRegistry(MODEL_PATH, prefer_compact=settings.prefer_compact_model, mmap=settings.model_mmap)
+executor = InferenceExecutor(
+    kind=settings.executor_kind,
+    workers=settings.executor_workers,
+    max_pending=settings.max_pending,
+    mmap=settings.model_mmap,
+)
+batcher = (
+    MicroBatcher(
+        registry,
+        executor,
+        max_batch=settings.microbatch_max_rows,
+        max_wait=settings.microbatch_max_wait_ms / 1000,
+        max_queue=settings.max_pending * settings.microbatch_max_rows,
+    )
+    if settings.microbatch_enabled
+    else None
+)
+cache = PredictionCache(settings.cache_size, settings.cache_ttl) if settings.cache_size > 0 else None
+if cache is not None:
+    registry.add_listener(lambda _: cache.clear())
+
+metrics = MetricsRegistry()
+REQUESTS = metrics.counter("inference_requests_total", "HTTP requests handled.", ("endpoint", "status"))
+ERRORS = metrics.counter("inference_request_errors_total", "HTTP requests answered with status >= 400.", ("endpoint",))
+LATENCY = metrics.histogram("inference_request_latency_seconds", "End-to-end request latency.", ("endpoint",))
+PHASE_LATENCY = metrics.histogram(
+    "inference_phase_latency_seconds",
+    "Latency per request phase: parse, model_load, predict, serialize.",
+    ("endpoint", "phase"),
+)
+IN_FLIGHT = metrics.gauge("inference_in_flight_requests", "Requests currently being handled.")
+MODEL_LOAD_SECONDS = metrics.gauge("inference_model_load_seconds", "Time spent loading the current model.")
+MODEL_RELOADS = metrics.counter("inference_model_reloads_total", "Successful hot reloads since startup.")
+EXECUTOR_PENDING = metrics.gauge("inference_executor_pending", "Predict calls queued or running on the executor.")
+EXECUTOR_REJECTED = metrics.counter("inference_executor_rejected_total", "Predict calls rejected with 429.")
+MICROBATCH_BATCHES = metrics.counter("inference_microbatch_batches_total", "Micro-batches scored.")
+MICROBATCH_ROWS = metrics.counter("inference_microbatch_rows_total", "Rows scored through the micro-batcher.")
+CACHE_HITS = metrics.counter("inference_cache_hits_total", "Prediction cache hits.")
+CACHE_MISSES = metrics.counter("inference_cache_misses_total", "Prediction cache misses.")
+CACHE_SIZE = metrics.gauge("inference_cache_entries", "Entries currently held in the prediction cache.")
+
+
+def observe_phase(endpoint: str, phase: str, started: float) -> float:
+    now = time.perf_counter()
+    PHASE_LATENCY.observe(now - started, endpoint=endpoint, phase=phase)
+    return now
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await asyncio.to_thread(registry.reload_if_changed)
+    executor.start()
+    watcher = None
+    if settings.reload_interval > 0:
+        watcher = asyncio.create_task(registry.watch(settings.reload_interval))
+    if batcher is not None:
+        batcher.start()
+    try:
+        yield
+    finally:
+        if batcher is not None:
+            await batcher.stop()
+        if watcher is not None:
+            watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await watcher
+        executor.shutdown()
+
+
+app = FastAPI(title="AI-ML FastAPI Inference", version="1.0.0", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    request.state.started = started
+    IN_FLIGHT.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        IN_FLIGHT.dec()
+        finished = time.perf_counter()
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        REQUESTS.inc(endpoint=endpoint, status=str(status))
+        if status >= 400:
+            ERRORS.inc(endpoint=endpoint)
+        LATENCY.observe(finished - started, endpoint=endpoint)
+        # Handlers stamp `handler_done` once predict returns; the rest is
+        # building the response model and encoding JSON.
+        handler_done = getattr(request.state, "handler_done", None)
+        if handler_done is not None:
+            PHASE_LATENCY.observe(finished - handler_done, endpoint=endpoint, phase="serialize")
 
 
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "model": registry.status(),
+        "executor": executor.stats(),
+        "microbatch": batcher.stats() if batcher is not None else None,
+        "cache": cache.stats() if cache is not None else None,
+    }
+
+
+@app.get("/metrics")
+def metrics_endpoint() -> Response:
+    model = registry.status()
+    MODEL_LOAD_SECONDS.set(model.get("load_seconds", 0.0))
+    MODEL_RELOADS.set_total(registry.reload_count)
+    EXECUTOR_PENDING.set(executor.pending)
+    EXECUTOR_REJECTED.set_total(executor.rejected)
+    if batcher is not None:
+        MICROBATCH_BATCHES.set_total(batcher.batches)
+        MICROBATCH_ROWS.set_total(batcher.rows)
+    if cache is not None:
+        cache_stats = cache.stats()
+        CACHE_HITS.set_total(cache_stats["hits"])
+        CACHE_MISSES.set_total(cache_stats["misses"])
+        CACHE_SIZE.set(cache_stats["size"])
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def overloaded(exc: QueueFullError) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
 
 
 @app.post("/predict", response_model=PredictResponse)
-def predict(payload: PredictRequest) -> PredictResponse:
+async def predict(payload: PredictRequest, request: Request) -> PredictResponse:
+    endpoint = "/predict"
+    # Body read and pydantic validation happen before the handler is entered.
+    mark = observe_phase(endpoint, "parse", getattr(request.state, "started", time.perf_counter()))
+    # Rejected before the micro-batcher, so one bad row cannot fail a shared batch.
+    if not np.isfinite(payload.features).all():
+        raise HTTPException(status_code=400, detail="Input contains NaN or infinity")
+    try:
+        loaded = registry.current()
+        mark = observe_phase(endpoint, "model_load", mark)
+        cached = cache.get(loaded.version, payload.features) if cache is not None else None
+        if cached is not None:
+            pred, version = cached, loaded.version
+        elif batcher is not None:
+            pred, version = await batcher.submit(payload.features)
+        else:
+            pred = (await executor.predict_rows(loaded, [payload.features]))[0]
+            version = loaded.version
+        if cache is not None and cached is None:
+            cache.put(version, payload.features, pred)
+        request.state.handler_done = observe_phase(endpoint, "predict", mark)
+        return PredictResponse(prediction=pred, model_version=version)
+    except QueueFullError as exc:
+        raise overloaded(exc) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def parse_npy_matrix(body: bytes) -> np.ndarray:
     try:
-        model = load_model()
-        features = np.array(payload.features, dtype=float).reshape(1, -1)
-        pred = int(model.predict(features)[0])
-        return PredictResponse(prediction=pred)
+        matrix = np.load(io.BytesIO(body), allow_pickle=False)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail=f"Invalid .npy payload: {exc}") from exc
+    if matrix.dtype.kind not in "fiu":
+        raise HTTPException(status_code=400, detail=f"Unsupported dtype: {matrix.dtype}")
+    return matrix
+
+
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_batch(request: Request, return_proba: bool = False) -> BatchPredictResponse:
+    endpoint = "/predict/batch"
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    body = await request.body()
+
+    if content_type == NPY_CONTENT_TYPE:
+        matrix = parse_npy_matrix(body)
+    elif content_type == "application/json":
+        try:
+            payload = BatchPredictRequest.model_validate_json(body)
+        except ValidationError as exc:
+            raise HTTPException(status_code=422, detail=exc.errors(include_url=False)) from exc
+        matrix = np.asarray(payload.features, dtype=float)
+        return_proba = return_proba or payload.return_proba
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Use application/json or {NPY_CONTENT_TYPE}, got {content_type}",
+        )
+
+    if matrix.ndim != 2 or matrix.shape[1] != N_FEATURES or matrix.shape[0] == 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected a non-empty N x {N_FEATURES} matrix, got shape {matrix.shape}",
+        )
+    if matrix.shape[0] > settings.batch_max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {matrix.shape[0]} rows, limit is {settings.batch_max_rows}",
+        )
+
+    features = np.ascontiguousarray(matrix, dtype=float)
+    mark = observe_phase(endpoint, "parse", getattr(request.state, "started", time.perf_counter()))
+    try:
+        loaded = registry.current()
+        mark = observe_phase(endpoint, "model_load", mark)
+        preds, proba = await executor.predict_matrix(loaded, features, return_proba)
+        request.state.handler_done = observe_phase(endpoint, "predict", mark)
+    except QueueFullError as exc:
+        raise overloaded(exc) from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return BatchPredictResponse(
+        predictions=preds,
+        probabilities=proba,
+        model_version=loaded.version,
+        count=len(preds),
+    )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections import Counter
+
+from .inference import InferenceExecutor, QueueFullError
+from .registry import ModelRegistry
+
+
+class MicroBatcher:
+    # Collects concurrent single-row requests for up to `max_wait` seconds or
+    # `max_batch` rows, whichever comes first, and scores them in one call.
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        executor: InferenceExecutor,
+        max_batch: int,
+        max_wait: float,
+        max_queue: int,
+    ) -> None:
+        self.registry = registry
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue[tuple[list[float], asyncio.Future]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.rows = 0
+        self.max_realized = 0
+        self.size_counts: Counter[int] = Counter()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        self._worker = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, row: list[float]) -> tuple[int, str]:
+        if self._queue.qsize() >= self.max_queue:
+            raise QueueFullError(f"Micro-batch queue is full ({self.max_queue} rows waiting)")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _collect(self) -> list[tuple[list[float], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            pending = [(row, future) for row, future in batch if not future.cancelled()]
+            if not pending:
+                continue
+
+            self.batches += 1
+            self.rows += len(pending)
+            self.max_realized = max(self.max_realized, len(pending))
+            self.size_counts[len(pending)] += 1
+
+            # Score in the background so the next batch can be collected while
+            # this one runs; the executor bounds how many run at once.
+            task = asyncio.create_task(self._score(pending))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score(self, pending: list[tuple[list[float], asyncio.Future]]) -> None:
+        try:
+            loaded = self.registry.current()
+            preds = await self.executor.predict_rows(loaded, [row for row, _ in pending])
+        except Exception as exc:  # noqa: BLE001
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), pred in zip(pending, preds):
+            if not future.done():
+                future.set_result((pred, loaded.version))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 3) if self.batches else 0.0,
+            "max_realized_batch": self.max_realized,
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "batch_size_counts": dict(sorted(self.size_counts.items())),
+        }
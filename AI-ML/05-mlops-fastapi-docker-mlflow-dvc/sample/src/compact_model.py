@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Kept free of scikit-learn imports so the API can serve linear models
+# without paying sklearn's import time at container startup.
+
+COMPACT_SUFFIX = ".npz"
+SUPPORTED_ESTIMATORS = {"LogisticRegression", "LogisticRegressionCV"}
+
+
+def _sigmoid(scores: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-scores))
+
+
+@dataclass(frozen=True)
+class LinearModel:
+    coef: np.ndarray
+    intercept: np.ndarray
+    classes: np.ndarray
+    proba: str
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        # Mirror sklearn's input check: NaN/inf would otherwise produce a class
+        # and probabilities instead of an error.
+        if not np.isfinite(features).all():
+            raise ValueError("Input contains NaN or infinity")
+        return features @ self.coef.T + self.intercept
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(features)
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[scores.argmax(axis=1)]
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(features)
+        if scores.shape[1] == 1:
+            positive = _sigmoid(scores[:, 0])
+            return np.column_stack([1.0 - positive, positive])
+        if self.proba == "softmax":
+            shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return shifted / shifted.sum(axis=1, keepdims=True)
+        probs = _sigmoid(scores)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = False) -> LinearModel:
+        if mmap:
+            data = mmap_npz(path)
+        else:
+            with np.load(path, allow_pickle=False) as archive:
+                data = {name: archive[name] for name in archive.files}
+        return cls(
+            coef=data["coef"],
+            intercept=data["intercept"],
+            classes=data["classes"],
+            proba=str(data["proba"].item()),
+        )
+
+
+def mmap_npz(path: Path) -> dict[str, np.ndarray]:
+    # np.load ignores mmap_mode for .npz, but np.savez stores members
+    # uncompressed, so each array can be mapped straight from the archive.
+    # Every process that maps the file shares the same page-cache copy.
+    arrays: dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, path.open("rb") as handle:
+        for info in archive.infolist():
+            name = info.filename.removesuffix(".npy")
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {info.filename} is compressed and cannot be memory-mapped")
+
+            handle.seek(info.header_offset)
+            header = handle.read(30)
+            if header[:4] != b"PK\x03\x04":
+                raise ValueError(f"{path}: bad local header for {info.filename}")
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            handle.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(handle)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+            else:
+                arrays[name] = np.load(archive.open(info), allow_pickle=False)
+                continue
+
+            if dtype.hasobject:
+                raise ValueError(f"{path}: member {info.filename} holds Python objects")
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=handle.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+def _proba_mode(model) -> str:
+    if getattr(model, "multi_class", "auto") == "ovr" or getattr(model, "solver", "") == "liblinear":
+        return "ovr"
+    return "softmax"
+
+
+def replace_atomically(path: Path, write) -> None:
+    # Write next to the target and rename, so readers (e.g. the API's hot
+    # reload) never observe a half-written artifact. The rename also gives the
+    # new file a fresh inode, so processes that still memory-map the old one
+    # keep a consistent view until they reload.
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def compact_path(model_path: Path) -> Path:
+    return model_path.with_suffix(COMPACT_SUFFIX)
+
+
+def export_linear(model, path: Path) -> bool:
+    if type(model).__name__ not in SUPPORTED_ESTIMATORS:
+        return False
+    arrays = {
+        "coef": np.ascontiguousarray(model.coef_, dtype=np.float64),
+        "intercept": np.ascontiguousarray(model.intercept_, dtype=np.float64),
+        "classes": np.asarray(model.classes_),
+        "proba": np.asarray(_proba_mode(model)),
+    }
+
+    def write(tmp_path: Path) -> None:
+        with tmp_path.open("wb") as handle:
+            np.savez(handle, **arrays)
+
+    replace_atomically(path, write)
+    return True
+
+
+def load_artifact(path: Path, mmap: bool = False):
+    if path.suffix == COMPACT_SUFFIX:
+        return LinearModel.load(path, mmap=mmap)
+    import joblib
+
+    # Arrays inside an uncompressed joblib pickle can be mapped instead of copied.
+    return joblib.load(path, mmap_mode="r" if mmap else None)
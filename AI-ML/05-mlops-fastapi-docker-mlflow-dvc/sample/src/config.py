@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+@dataclass(frozen=True)
+class Settings:
+    model_path: Path
+    reload_interval: float
+    prefer_compact_model: bool
+    model_mmap: bool
+    batch_max_rows: int
+    microbatch_enabled: bool
+    microbatch_max_rows: int
+    microbatch_max_wait_ms: float
+    executor_kind: str
+    executor_workers: int
+    max_pending: int
+    cache_size: int
+    cache_ttl: float
+
+
+def _resolve_path(raw: str) -> Path:
+    path = Path(raw)
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def _env_bool(name: str, default: str) -> bool:
+    value = os.getenv(name, default).strip().lower()
+    if value in {"1", "true", "yes", "on"}:
+        return True
+    if value in {"0", "false", "no", "off"}:
+        return False
+    raise ValueError(f"{name} must be a boolean (true/false)")
+
+
+def load_settings() -> Settings:
+    model_path = _resolve_path(os.getenv("MODEL_PATH", "models/model.joblib").strip())
+
+    try:
+        reload_interval = float(os.getenv("MODEL_RELOAD_INTERVAL", "2.0"))
+    except ValueError as exc:
+        raise ValueError("MODEL_RELOAD_INTERVAL must be a float") from exc
+
+    prefer_compact_model = _env_bool("PREFER_COMPACT_MODEL", "true")
+    model_mmap = _env_bool("MODEL_MMAP", "true")
+
+    try:
+        batch_max_rows = int(os.getenv("BATCH_MAX_ROWS", "100000"))
+    except ValueError as exc:
+        raise ValueError("BATCH_MAX_ROWS must be an integer") from exc
+
+    microbatch_enabled = _env_bool("MICROBATCH_ENABLED", "true")
+
+    try:
+        microbatch_max_rows = int(os.getenv("MICROBATCH_MAX_ROWS", "64"))
+    except ValueError as exc:
+        raise ValueError("MICROBATCH_MAX_ROWS must be an integer") from exc
+
+    try:
+        microbatch_max_wait_ms = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2.0"))
+    except ValueError as exc:
+        raise ValueError("MICROBATCH_MAX_WAIT_MS must be a float") from exc
+
+    executor_kind = os.getenv("INFERENCE_EXECUTOR", "thread").strip().lower()
+
+    try:
+        executor_workers = int(os.getenv("INFERENCE_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+    except ValueError as exc:
+        raise ValueError("INFERENCE_WORKERS must be an integer") from exc
+
+    try:
+        max_pending = int(os.getenv("INFERENCE_MAX_PENDING", "256"))
+    except ValueError as exc:
+        raise ValueError("INFERENCE_MAX_PENDING must be an integer") from exc
+
+    try:
+        cache_size = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+    except ValueError as exc:
+        raise ValueError("PREDICTION_CACHE_SIZE must be an integer") from exc
+
+    try:
+        cache_ttl = float(os.getenv("PREDICTION_CACHE_TTL", "60"))
+    except ValueError as exc:
+        raise ValueError("PREDICTION_CACHE_TTL must be a float") from exc
+
+    if reload_interval < 0:
+        raise ValueError("MODEL_RELOAD_INTERVAL must be >= 0 (0 disables hot reload)")
+    if batch_max_rows <= 0:
+        raise ValueError("BATCH_MAX_ROWS must be > 0")
+    if microbatch_max_rows <= 0:
+        raise ValueError("MICROBATCH_MAX_ROWS must be > 0")
+    if microbatch_max_wait_ms < 0:
+        raise ValueError("MICROBATCH_MAX_WAIT_MS must be >= 0")
+    if executor_kind not in {"thread", "process"}:
+        raise ValueError("INFERENCE_EXECUTOR must be 'thread' or 'process'")
+    if executor_workers <= 0:
+        raise ValueError("INFERENCE_WORKERS must be > 0")
+    if max_pending <= 0:
+        raise ValueError("INFERENCE_MAX_PENDING must be > 0")
+    if cache_size < 0:
+        raise ValueError("PREDICTION_CACHE_SIZE must be >= 0 (0 disables the cache)")
+    if cache_ttl <= 0:
+        raise ValueError("PREDICTION_CACHE_TTL must be > 0")
+
+    return Settings(
+        model_path=model_path,
+        reload_interval=reload_interval,
+        prefer_compact_model=prefer_compact_model,
+        model_mmap=model_mmap,
+        batch_max_rows=batch_max_rows,
+        microbatch_enabled=microbatch_enabled,
+        microbatch_max_rows=microbatch_max_rows,
+        microbatch_max_wait_ms=microbatch_max_wait_ms,
+        executor_kind=executor_kind,
+        executor_workers=executor_workers,
+        max_pending=max_pending,
+        cache_size=cache_size,
+        cache_ttl=cache_ttl,
+    )
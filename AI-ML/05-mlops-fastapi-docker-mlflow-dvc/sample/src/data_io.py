@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = BASE_DIR / "data"
+MODELS_DIR = BASE_DIR / "models"
+PARAMS_PATH = BASE_DIR / "params.yaml"
+
+RAW_PATH = DATA_DIR / "iris.npz"
+TRAIN_PATH = DATA_DIR / "train.npz"
+TEST_PATH = DATA_DIR / "test.npz"
+MODEL_PATH = MODELS_DIR / "model.joblib"
+METRICS_PATH = BASE_DIR / "metrics.json"
+
+FEATURE_COLUMNS = ("sepal_length", "sepal_width", "petal_length", "petal_width")
+TARGET_COLUMN = "target"
+
+
+def load_params(section: str) -> dict:
+    with PARAMS_PATH.open() as handle:
+        return dict(yaml.safe_load(handle)[section])
+
+
+def save_columns(path: Path, columns: dict[str, np.ndarray]) -> None:
+    # One uncompressed array per column: readers only touch the columns they ask for.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as handle:
+        np.savez(handle, **columns)
+
+
+def load_columns(path: Path, names: tuple[str, ...] | None = None) -> dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in (names or archive.files)}
+
+
+def load_xy(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    columns = load_columns(path, FEATURE_COLUMNS + (TARGET_COLUMN,))
+    X = np.column_stack([columns[name] for name in FEATURE_COLUMNS])
+    return X, columns[TARGET_COLUMN]
+
+
+def save_xy(path: Path, X: np.ndarray, y: np.ndarray) -> None:
+    columns = {name: np.ascontiguousarray(X[:, i]) for i, name in enumerate(FEATURE_COLUMNS)}
+    columns[TARGET_COLUMN] = y
+    save_columns(path, columns)
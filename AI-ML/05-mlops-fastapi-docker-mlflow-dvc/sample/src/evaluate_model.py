@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import json
+
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score
+
+from data_io import METRICS_PATH, MODEL_PATH, TEST_PATH, load_xy
+
+
+def evaluate(model, X_test: np.ndarray, y_test: np.ndarray) -> dict:
+    preds = model.predict(X_test)
+    return {
+        "accuracy": float(accuracy_score(y_test, preds)),
+        "f1_macro": float(f1_score(y_test, preds, average="macro")),
+    }
+
+
+def main() -> None:
+    X_test, y_test = load_xy(TEST_PATH)
+    metrics = evaluate(joblib.load(MODEL_PATH), X_test, y_test)
+    METRICS_PATH.write_text(json.dumps(metrics, indent=2))
+    print(metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from compact_model import compact_path, export_linear, replace_atomically
+from data_io import MODEL_PATH, TRAIN_PATH, load_params, load_xy
+
+
+def fit(params: dict, X_train: np.ndarray, y_train: np.ndarray) -> LogisticRegression:
+    model = LogisticRegression(**params)
+    model.fit(X_train, y_train)
+    return model
+
+
+def save_model(model, model_path: Path) -> None:
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    # compress=0 keeps the numpy arrays raw so the API can open them with mmap_mode="r".
+    replace_atomically(model_path, lambda tmp_path: joblib.dump(model, tmp_path, compress=0))
+    # Linear models also get a small .npz the API can serve without sklearn;
+    # drop a stale one otherwise so the API falls back to the joblib file.
+    if not export_linear(model, compact_path(model_path)):
+        compact_path(model_path).unlink(missing_ok=True)
+
+
+def main() -> None:
+    X_train, y_train = load_xy(TRAIN_PATH)
+    model = fit(load_params("fit"), X_train, y_train)
+    save_model(model, MODEL_PATH)
+    print(f"Saved {MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from .compact_model import load_artifact
+from .registry import LoadedModel
+
+EXECUTOR_KINDS = {"thread", "process"}
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+def predict_rows(model, rows: list[list[float]]) -> list[int]:
+    return model.predict(np.asarray(rows, dtype=float)).astype(int).tolist()
+
+
+def predict_matrix(model, features: np.ndarray, return_proba: bool) -> tuple[list[int], list[list[float]] | None]:
+    # One vectorized call for the whole batch instead of one per row.
+    preds = model.predict(features).astype(int).tolist()
+    proba = model.predict_proba(features).tolist() if return_proba else None
+    return preds, proba
+
+
+_worker_model: tuple[str, object] | None = None
+
+
+def _model_in_worker(model_path: str, version: str, mmap: bool):
+    # Each pool process keeps its own copy and reloads it only when the
+    # registry reports a new version, so models are not pickled per call.
+    global _worker_model
+    if _worker_model is None or _worker_model[0] != version:
+        _worker_model = (version, load_artifact(Path(model_path), mmap=mmap))
+    return _worker_model[1]
+
+
+def _predict_rows_in_worker(model_path: str, version: str, mmap: bool, rows: list[list[float]]) -> list[int]:
+    return predict_rows(_model_in_worker(model_path, version, mmap), rows)
+
+
+def _predict_matrix_in_worker(
+    model_path: str,
+    version: str,
+    mmap: bool,
+    features: np.ndarray,
+    return_proba: bool,
+) -> tuple[list[int], list[list[float]] | None]:
+    return predict_matrix(_model_in_worker(model_path, version, mmap), features, return_proba)
+
+
+class InferenceExecutor:
+    # Runs CPU-bound predict calls off the event loop on a dedicated pool.
+    # Once `max_pending` calls are queued or running, new work is rejected
+    # with QueueFullError instead of piling up behind a slow model.
+    def __init__(self, kind: str, workers: int, max_pending: int, mmap: bool = True) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.mmap = mmap
+        self._pool: Executor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def _submit(self, fn, *args):
+        if self._pool is None:
+            raise RuntimeError("Inference executor is not running")
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(f"Inference queue is full ({self.max_pending} pending)")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, partial(fn, *args))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def predict_rows(self, loaded: LoadedModel, rows: list[list[float]]) -> list[int]:
+        if self.kind == "process":
+            return await self._submit(_predict_rows_in_worker, str(loaded.path), loaded.version, self.mmap, rows)
+        return await self._submit(predict_rows, loaded.model, rows)
+
+    async def predict_matrix(
+        self,
+        loaded: LoadedModel,
+        features: np.ndarray,
+        return_proba: bool,
+    ) -> tuple[list[int], list[list[float]] | None]:
+        if self.kind == "process":
+            return await self._submit(
+                _predict_matrix_in_worker,
+                str(loaded.path),
+                loaded.version,
+                self.mmap,
+                features,
+                return_proba,
+            )
+        return await self._submit(predict_matrix, loaded.model, features, return_proba)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+# Limits enforced by MLflow for a single log_batch call.
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+
+_TICK = object()
+
+
+def _chunks(metrics: list[Metric], params: list[Param]):
+    while metrics or params:
+        take_params = params[:MAX_PARAMS_PER_BATCH]
+        take_metrics = metrics[: min(MAX_METRICS_PER_BATCH, MAX_ENTITIES_PER_BATCH - len(take_params))]
+        params = params[len(take_params) :]
+        metrics = metrics[len(take_metrics) :]
+        yield take_metrics, take_params
+
+
+class BatchedMlflowLogger:
+    # Queues params/metrics and writes them with `log_batch` from a background
+    # thread, so callers never wait on a tracking-store round-trip per value.
+    # Use it as a context manager (or call `close()`) to guarantee a final flush.
+    def __init__(
+        self,
+        client: MlflowClient | None = None,
+        flush_interval: float = 1.0,
+        max_pending: int = MAX_ENTITIES_PER_BATCH,
+    ) -> None:
+        self.client = client or MlflowClient()
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: queue.Queue = queue.Queue()
+        self._error: BaseException | None = None
+        self._closed = False
+        self.batches_sent = 0
+        self._thread = threading.Thread(target=self._run, name="mlflow-batch-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log_param(self, run_id: str, key: str, value) -> None:
+        self._put(run_id, Param(key, str(value)))
+
+    def log_params(self, run_id: str, params: dict) -> None:
+        for key, value in params.items():
+            self.log_param(run_id, key, value)
+
+    def log_metric(self, run_id: str, key: str, value: float, step: int = 0) -> None:
+        self._put(run_id, Metric(key, float(value), int(time.time() * 1000), step))
+
+    def log_metrics(self, run_id: str, metrics: dict, step: int = 0) -> None:
+        timestamp = int(time.time() * 1000)
+        for key, value in metrics.items():
+            self._put(run_id, Metric(key, float(value), timestamp, step))
+
+    def flush(self) -> None:
+        # close() already flushed and stopped the consumer thread, so nothing
+        # would ever answer a new flush request.
+        if self._closed:
+            raise RuntimeError("Logger is closed")
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+        self._raise_pending_error()
+
+    def __enter__(self) -> BatchedMlflowLogger:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _put(self, run_id: str, entity: Metric | Param) -> None:
+        if self._closed:
+            raise RuntimeError("Logger is closed")
+        self._raise_pending_error()
+        self._queue.put((run_id, entity))
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Background MLflow logging failed") from error
+
+    def _send(self, pending: list[tuple[str, Metric | Param]]) -> None:
+        by_run: dict[str, tuple[list[Metric], list[Param]]] = defaultdict(lambda: ([], []))
+        for run_id, entity in pending:
+            metrics, params = by_run[run_id]
+            (params if isinstance(entity, Param) else metrics).append(entity)
+        for run_id, (metrics, params) in by_run.items():
+            for chunk_metrics, chunk_params in _chunks(metrics, params):
+                self.client.log_batch(run_id, metrics=chunk_metrics, params=chunk_params)
+                self.batches_sent += 1
+
+    def _run(self) -> None:
+        pending: list[tuple[str, Metric | Param]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = _TICK
+
+            if isinstance(item, tuple):
+                pending.append(item)
+                if len(pending) < self.max_pending and time.monotonic() < deadline:
+                    continue
+
+            # Timer tick, full buffer, explicit flush or close: write everything out.
+            if pending:
+                try:
+                    self._send(pending)
+                except Exception as exc:  # noqa: BLE001
+                    self._error = exc
+                pending = []
+            deadline = time.monotonic() + self.flush_interval
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import numpy as np
+from sklearn.datasets import load_iris
+
+from data_io import RAW_PATH, save_xy
+
+
+def load_dataset() -> tuple[np.ndarray, np.ndarray]:
+    return load_iris(return_X_y=True)
+
+
+def main() -> None:
+    X, y = load_dataset()
+    save_xy(RAW_PATH, X, y)
+    print(f"Wrote {len(y)} rows to {RAW_PATH}")
+
+
+if __name__ == "__main__":
+    main()
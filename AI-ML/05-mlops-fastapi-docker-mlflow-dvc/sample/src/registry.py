@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .compact_model import COMPACT_SUFFIX, compact_path, load_artifact
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    model: Any
+    path: Path
+    version: str
+    loaded_at: float
+    load_seconds: float
+    mtime_ns: int
+    size: int
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class ModelRegistry:
+    # Requests read `current()` once and keep that reference until they finish,
+    # so rebinding `_loaded` to a new model never disturbs in-flight requests.
+    def __init__(self, model_path: Path, prefer_compact: bool = True, mmap: bool = True) -> None:
+        self.model_path = model_path
+        self.prefer_compact = prefer_compact
+        self.mmap = mmap
+        self._loaded: LoadedModel | None = None
+        self._reload_lock = threading.Lock()
+        self.reload_count = 0
+        self.last_error: str | None = None
+        self._listeners: list[Callable[[LoadedModel], None]] = []
+
+    def add_listener(self, callback: Callable[[LoadedModel], None]) -> None:
+        # Called after every successful swap, e.g. to drop cached predictions.
+        self._listeners.append(callback)
+
+    def current(self) -> LoadedModel:
+        loaded = self._loaded
+        if loaded is None:
+            raise RuntimeError(f"Model file not found: {self.model_path}")
+        return loaded
+
+    def artifact_path(self) -> Path:
+        compact = compact_path(self.model_path)
+        if self.prefer_compact and compact.exists():
+            return compact
+        return self.model_path
+
+    def _load(self, path: Path, mtime_ns: int, size: int, version: str) -> LoadedModel:
+        started = time.perf_counter()
+        model = load_artifact(path, mmap=self.mmap)
+        return LoadedModel(
+            model=model,
+            path=path,
+            version=version,
+            loaded_at=time.time(),
+            load_seconds=time.perf_counter() - started,
+            mtime_ns=mtime_ns,
+            size=size,
+        )
+
+    def reload_if_changed(self) -> bool:
+        with self._reload_lock:
+            path = self.artifact_path()
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return False
+
+            current = self._loaded
+            if current is not None and (path, stat.st_mtime_ns, stat.st_size) == (
+                current.path,
+                current.mtime_ns,
+                current.size,
+            ):
+                return False
+
+            try:
+                version = file_digest(path)
+                if current is not None and (path, version) == (current.path, current.version):
+                    # Touched but identical content: remember the new stat, skip unpickling.
+                    self._loaded = LoadedModel(
+                        model=current.model,
+                        path=current.path,
+                        version=current.version,
+                        loaded_at=current.loaded_at,
+                        load_seconds=current.load_seconds,
+                        mtime_ns=stat.st_mtime_ns,
+                        size=stat.st_size,
+                    )
+                    return False
+                loaded = self._load(path, stat.st_mtime_ns, stat.st_size, version)
+            except Exception as exc:  # noqa: BLE001
+                # A half-written artifact must not take down the model we are serving.
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                return False
+
+            self._loaded = loaded
+            self.last_error = None
+            if current is not None:
+                self.reload_count += 1
+            for callback in self._listeners:
+                callback(loaded)
+            return True
+
+    async def watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload_if_changed)
+
+    def status(self) -> dict:
+        loaded = self._loaded
+        if loaded is None:
+            return {
+                "loaded": False,
+                "path": str(self.model_path),
+                "last_error": self.last_error,
+            }
+        return {
+            "loaded": True,
+            "path": str(loaded.path),
+            "format": "compact" if loaded.path.suffix == COMPACT_SUFFIX else "joblib",
+            "mmap": self.mmap,
+            "version": loaded.version,
+            "loaded_at": loaded.loaded_at,
+            "load_seconds": round(loaded.load_seconds, 6),
+            "reload_count": self.reload_count,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from data_io import RAW_PATH, TEST_PATH, TRAIN_PATH, load_params, load_xy, save_xy
+
+
+def split(X: np.ndarray, y: np.ndarray, params: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    return train_test_split(
+        X,
+        y,
+        test_size=params["test_size"],
+        random_state=params["random_state"],
+        stratify=y,
+    )
+
+
+def main() -> None:
+    X, y = load_xy(RAW_PATH)
+    X_train, X_test, y_train, y_test = split(X, y, load_params("split"))
+    save_xy(TRAIN_PATH, X_train, y_train)
+    save_xy(TEST_PATH, X_test, y_test)
+    print(f"Train rows: {len(y_train)}, test rows: {len(y_test)}")
+
+
+if __name__ == "__main__":
+    main()
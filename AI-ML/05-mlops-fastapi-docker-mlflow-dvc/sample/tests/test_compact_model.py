@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from compact_model import LinearModel, export_linear  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+
+LABELS = {
+    "binary": np.array([0, 1]),
+    "multiclass": np.array([0, 1, 2]),
+    "string": np.array(["setosa", "versicolor", "virginica"]),
+}
+
+
+@pytest.fixture
+def model() -> LinearModel:
+    return LinearModel(
+        coef=np.array([[1.0, 0.0], [0.0, 1.0], [-1.0, -1.0]]),
+        intercept=np.zeros(3),
+        classes=np.array([0, 1, 2]),
+        proba="softmax",
+    )
+
+
+def test_finite_input_is_scored(model: LinearModel) -> None:
+    assert model.predict(np.array([[2.0, 1.0]])).tolist() == [0]
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+@pytest.mark.parametrize("method", ["predict", "predict_proba", "decision_function"])
+def test_non_finite_input_is_rejected(model: LinearModel, method: str, bad: float) -> None:
+    with pytest.raises(ValueError, match="NaN or infinity"):
+        getattr(model, method)(np.array([[1.0, 2.0], [bad, 0.0]]))
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+@pytest.mark.parametrize("labels", sorted(LABELS))
+def test_matches_sklearn(tmp_path: Path, labels: str, mmap: bool) -> None:
+    classes = LABELS[labels]
+    X, y = make_classification(
+        n_samples=300, n_features=6, n_informative=4, n_classes=len(classes), random_state=0
+    )
+    sk_model = LogisticRegression(max_iter=1000).fit(X, classes[y])
+    path = tmp_path / "model.npz"
+    assert export_linear(sk_model, path)
+
+    compact = LinearModel.load(path, mmap=mmap)
+    assert compact.predict(X).tolist() == sk_model.predict(X).tolist()
+    np.testing.assert_allclose(compact.predict_proba(X), sk_model.predict_proba(X), rtol=1e-9, atol=1e-12)
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import os
+import re
+import shutil
 import time
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 
 PROMPT_TEMPLATE_VERSION = "v1-grounded-json"
+INDEX_FORMAT_VERSION = 1
+# TfidfVectorizer defaults, so saved indexes tokenize queries without sklearn.
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+RETRIEVAL_METHODS = ("auto", "matrix", "postings")
+# Upper bound on dense scores held at once by batched retrieval (128 MB of
+# float64); the query block size is derived from it and the corpus size.
+SCORE_BLOCK_ELEMENTS = 1 << 24
 
 
 def load_knowledge_base(path: str) -> list[dict[str, Any]]:
@@ -50,41 +65,1043 @@ def chunk_text(text: str, chunk_size: int, overlap: int) -> list[str]:
     return chunks
 
 
-def build_retriever(chunks: list[str]):
-    if not chunks:
-        raise ValueError("chunks must not be empty")
+def chunk_documents(
+    docs: list[dict[str, Any]], chunk_size: int, overlap: int
+) -> tuple[list[str], list[str]]:
+    chunks: list[str] = []
+    chunk_doc_ids: list[str] = []
+    for doc in docs:
+        pieces = chunk_text(doc["text"], chunk_size, overlap)
+        chunks.extend(pieces)
+        chunk_doc_ids.extend([str(doc["id"])] * len(pieces))
+    return chunks, chunk_doc_ids
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    # argpartition finds the k best in O(n); only those k are then sorted.
+    # Ties keep the lower index first.
+    if top_k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    # Row-wise top_k_indices over a (queries, chunks) block, fully vectorized.
+    if top_k < scores.shape[1]:
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -candidate_scores), axis=-1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def _validate_query(query: str, top_k: int) -> None:
+    if not query.strip():
+        raise ValueError("question must not be empty")
+    if top_k <= 0:
+        raise ValueError("top_k must be > 0")
+
+
+class StringTable:
+    # Strings packed into one UTF-8 blob plus an offsets array, so a saved
+    # table is two memory-mapped files instead of a list to unpickle.
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: list[str]) -> StringTable:
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index] : self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def search(self, value: str) -> int:
+        # Binary search; only valid for tables built from sorted strings.
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self) and self[low] == value else -1
+
+    def save(self, path: Path, name: str) -> None:
+        np.save(path / f"{name}.blob.npy", self.blob)
+        np.save(path / f"{name}.offsets.npy", self.offsets)
+
+    @classmethod
+    def load(cls, path: Path, name: str, mmap_mode: str | None) -> StringTable:
+        return cls(
+            np.load(path / f"{name}.blob.npy", mmap_mode=mmap_mode),
+            np.load(path / f"{name}.offsets.npy", mmap_mode=mmap_mode),
+        )
+
+
+class Postings:
+    # Inverted index: the CSC form of the TF-IDF matrix, i.e. for every term
+    # the sorted chunk ids that contain it and their weights, plus each term's
+    # largest weight as a score upper bound.
+    def __init__(self, ptr: np.ndarray, rows: np.ndarray, weights: np.ndarray, term_max: np.ndarray) -> None:
+        self.ptr = ptr
+        self.rows = rows
+        self.weights = weights
+        self.term_max = term_max
+
+    @classmethod
+    def from_matrix(cls, matrix: sparse.csr_matrix) -> Postings:
+        csc = matrix.tocsc()
+        csc.sort_indices()
+        term_max = np.zeros(csc.shape[1], dtype=csc.dtype)
+        nonempty = np.diff(csc.indptr) > 0
+        if nonempty.any():
+            term_max[nonempty] = np.maximum.reduceat(csc.data, csc.indptr[:-1][nonempty])
+        return cls(csc.indptr, csc.indices, csc.data, term_max)
+
+    def term(self, column: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.ptr[column], self.ptr[column + 1]
+        return self.rows[start:end], self.weights[start:end]
+
+    def top_k(self, columns: np.ndarray, weights: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        # Term-at-a-time MaxScore. Terms are visited in decreasing order of
+        # their score bound. Once the current k-th best score beats everything
+        # the remaining terms could add, no new chunk can enter the top k. From
+        # then on, existing candidates are looked up in each remaining posting
+        # list by binary search, instead of scanning the list. Candidates whose
+        # best case falls below that score are also dropped along the way.
+        # Only postings of the query's terms are touched.
+        bounds = weights * self.term_max[columns]
+        order = np.argsort(-bounds, kind="stable")
+        columns, weights, bounds = columns[order], weights[order], bounds[order]
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+
+        cand_rows = np.empty(0, dtype=np.int64)
+        cand_scores = np.empty(0, dtype=float)
+        for j, (column, weight) in enumerate(zip(columns, weights)):
+            rows, values = self.term(column)
+            threshold = _kth_largest(cand_scores, top_k)
+            if remaining[j] < threshold:
+                pos = np.searchsorted(rows, cand_rows)
+                found = pos < len(rows)
+                found[found] = rows[pos[found]] == cand_rows[found]
+                cand_scores[found] += weight * values[pos[found]]
+            else:
+                all_rows = np.concatenate([cand_rows, rows])
+                all_scores = np.concatenate([cand_scores, weight * values])
+                cand_rows, inverse = np.unique(all_rows, return_inverse=True)
+                cand_scores = np.bincount(inverse, weights=all_scores, minlength=len(cand_rows))
+
+            threshold = _kth_largest(cand_scores, top_k)
+            if len(cand_rows) > top_k and threshold > 0:
+                keep = cand_scores + remaining[j + 1] >= threshold
+                cand_rows, cand_scores = cand_rows[keep], cand_scores[keep]
+
+        ranked = top_k_indices(cand_scores, top_k)
+        return cand_rows[ranked], cand_scores[ranked]
+
+
+def _kth_largest(values: np.ndarray, k: int) -> float:
+    if len(values) < k:
+        return 0.0
+    return float(np.partition(values, len(values) - k)[len(values) - k])
+
+
+class TfidfIndex:
+    # L2-normalized TF-IDF rows in CSR form. Vocabulary terms are stored sorted,
+    # which is also sklearn's column order, so a term's position is its column.
+    def __init__(
+        self,
+        terms: StringTable,
+        idf: np.ndarray,
+        matrix: sparse.csr_matrix,
+        chunks: StringTable,
+        chunk_docs: np.ndarray,
+        doc_ids: StringTable,
+        postings: Postings | None = None,
+    ) -> None:
+        self.terms = terms
+        self.idf = idf
+        self.matrix = matrix
+        self.chunks = chunks
+        self.chunk_docs = chunk_docs
+        self.doc_ids = doc_ids
+        self.postings = postings
+
+    @classmethod
+    def build(
+        cls,
+        chunks: list[str],
+        chunk_doc_ids: list[str] | None = None,
+        dtype: str = "float64",
+        postings: bool = True,
+    ) -> TfidfIndex:
+        if not chunks:
+            raise ValueError("chunks must not be empty")
+        vectorizer = TfidfVectorizer(dtype=np.dtype(dtype))
+        matrix = vectorizer.fit_transform(chunks).tocsr()
+        # scipy keeps mapped index arrays as-is only when both share a dtype
+        # that fits the values, so settle that before saving.
+        index_dtype = np.int32 if matrix.nnz < 2**31 and matrix.shape[1] < 2**31 else np.int64
+        matrix.indices = matrix.indices.astype(index_dtype, copy=False)
+        matrix.indptr = matrix.indptr.astype(index_dtype, copy=False)
+
+        doc_ids = chunk_doc_ids if chunk_doc_ids is not None else [str(i) for i in range(len(chunks))]
+        unique_docs, chunk_docs = np.unique(np.asarray(doc_ids, dtype=object).astype(str), return_inverse=True)
+        return cls(
+            terms=StringTable.from_strings(list(vectorizer.get_feature_names_out())),
+            idf=vectorizer.idf_.astype(dtype),
+            matrix=matrix,
+            chunks=StringTable.from_strings(chunks),
+            chunk_docs=chunk_docs.astype(np.int32),
+            doc_ids=StringTable.from_strings([str(doc_id) for doc_id in unique_docs]),
+            postings=Postings.from_matrix(matrix) if postings else None,
+        )
+
+    def save(self, path: str | Path, kb_sha256: str | None = None) -> None:
+        # Written to a sibling directory first, so a crash never leaves a
+        # half-written index behind under the real name.
+        target = Path(path)
+        tmp = target.with_name(f".{target.name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        self.terms.save(tmp, "terms")
+        self.chunks.save(tmp, "chunks")
+        self.doc_ids.save(tmp, "doc_ids")
+        np.save(tmp / "idf.npy", self.idf)
+        np.save(tmp / "chunk_docs.npy", self.chunk_docs)
+        np.save(tmp / "data.npy", self.matrix.data)
+        np.save(tmp / "indices.npy", self.matrix.indices)
+        np.save(tmp / "indptr.npy", self.matrix.indptr)
+        if self.postings is not None:
+            np.save(tmp / "postings.ptr.npy", self.postings.ptr)
+            np.save(tmp / "postings.rows.npy", self.postings.rows)
+            np.save(tmp / "postings.weights.npy", self.postings.weights)
+            np.save(tmp / "postings.term_max.npy", self.postings.term_max)
+        meta = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "shape": list(self.matrix.shape),
+            "nnz": int(self.matrix.nnz),
+            "dtype": str(self.matrix.dtype),
+            "postings": self.postings is not None,
+            "kb_sha256": kb_sha256,
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> TfidfIndex:
+        index_dir = Path(path)
+        meta_path = index_dir / "meta.json"
+        if not meta_path.exists():
+            raise ValueError(f"Index not found: {index_dir}")
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta["format_version"] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format {meta['format_version']} in {index_dir}")
+
+        mmap_mode = "r" if mmap else None
+        matrix = sparse.csr_matrix(
+            (
+                np.load(index_dir / "data.npy", mmap_mode=mmap_mode),
+                np.load(index_dir / "indices.npy", mmap_mode=mmap_mode),
+                np.load(index_dir / "indptr.npy", mmap_mode=mmap_mode),
+            ),
+            shape=tuple(meta["shape"]),
+            copy=False,
+        )
+        postings = None
+        if meta.get("postings"):
+            postings = Postings(
+                *(
+                    np.load(index_dir / f"postings.{name}.npy", mmap_mode=mmap_mode)
+                    for name in ("ptr", "rows", "weights", "term_max")
+                )
+            )
+        return cls(
+            terms=StringTable.load(index_dir, "terms", mmap_mode),
+            idf=np.load(index_dir / "idf.npy", mmap_mode=mmap_mode),
+            matrix=matrix,
+            chunks=StringTable.load(index_dir, "chunks", mmap_mode),
+            chunk_docs=np.load(index_dir / "chunk_docs.npy", mmap_mode=mmap_mode),
+            doc_ids=StringTable.load(index_dir, "doc_ids", mmap_mode),
+            postings=postings,
+        )
+
+    def query_vector(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        # Same result as TfidfVectorizer.transform: raw counts times IDF,
+        # then L2-normalized. Returns (columns, weights).
+        counts = Counter(TOKEN_PATTERN.findall(query.lower()))
+        columns, weights = [], []
+        for term, count in counts.items():
+            column = self.terms.search(term)
+            if column >= 0:
+                columns.append(column)
+                weights.append(count * float(self.idf[column]))
+        weights = np.asarray(weights, dtype=self.matrix.dtype)
+        norm = np.linalg.norm(weights)
+        return np.asarray(columns, dtype=np.int64), weights / norm if norm else weights
+
+    def query_matrix(self, queries: list[str]) -> sparse.csr_matrix:
+        # query_vector for many queries at once: each distinct token is looked
+        # up in the vocabulary once, and rows are normalized together.
+        counts = [Counter(TOKEN_PATTERN.findall(query.lower())) for query in queries]
+        vocabulary = {term: self.terms.search(term) for term in set().union(*counts)}
+
+        indptr = np.zeros(len(queries) + 1, dtype=np.int64)
+        columns: list[int] = []
+        tfs: list[int] = []
+        for row, query_counts in enumerate(counts):
+            for term, count in query_counts.items():
+                column = vocabulary[term]
+                if column >= 0:
+                    columns.append(column)
+                    tfs.append(count)
+            indptr[row + 1] = len(columns)
+
+        column_array = np.asarray(columns, dtype=np.int64)
+        weights = np.asarray(tfs, dtype=self.matrix.dtype) * self.idf[column_array]
+        rows = np.repeat(np.arange(len(queries)), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=len(queries)))
+        weights = weights / np.where(norms > 0, norms, 1.0)[rows]
+        return sparse.csr_matrix(
+            (weights.astype(self.matrix.dtype, copy=False), column_array, indptr),
+            shape=(len(queries), self.matrix.shape[1]),
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        columns, weights = self.query_vector(query)
+        q_vec = sparse.csr_matrix(
+            (weights, columns, [0, len(columns)]), shape=(1, self.matrix.shape[1])
+        )
+        # Rows and query are both unit length, so the dot product is the cosine.
+        return (self.matrix @ q_vec.T).toarray().ravel()
+
+    def search(self, query: str, top_k: int, method: str = "auto") -> tuple[np.ndarray, np.ndarray]:
+        if method not in RETRIEVAL_METHODS:
+            raise ValueError(f"Unknown retrieval method: {method} (expected one of {RETRIEVAL_METHODS})")
+        if method == "postings" and self.postings is None:
+            raise ValueError("Index was built without postings")
+
+        # Both methods return only chunks sharing a term with the query, so
+        # either may return fewer than top_k hits.
+        if method == "matrix" or self.postings is None:
+            scores = self.scores(query)
+            ranked_idx = top_k_indices(scores, top_k)
+            ranked_scores = scores[ranked_idx]
+        else:
+            columns, weights = self.query_vector(query)
+            ranked_idx, ranked_scores = self.postings.top_k(columns, weights, top_k)
+        matched = ranked_scores > 0.0
+        return ranked_idx[matched], ranked_scores[matched]
+
+    def search_many(self, queries: list[str], top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        # One sparse product per block of queries. Each block's scores are
+        # densified so top-k runs as a single argpartition over the block.
+        # Returns (queries, k) arrays of chunk ids and scores.
+        q_matrix = self.query_matrix(queries)
+        n_chunks = self.matrix.shape[0]
+        block = max(1, SCORE_BLOCK_ELEMENTS // max(1, n_chunks))
+        k = min(top_k, n_chunks)
+        ids = np.empty((len(queries), k), dtype=np.int64)
+        scores = np.empty((len(queries), k), dtype=float)
+        for start in range(0, len(queries), block):
+            q_block = q_matrix[start : start + block]
+            # matrix @ q.T keeps the big operand in its stored CSR layout.
+            block_scores = (self.matrix @ q_block.T).toarray().T
+            ids[start : start + block], scores[start : start + block] = top_k_rows(block_scores, k)
+        return ids, scores
+
+    def retrieve_many(self, queries: list[str], top_k: int = 3) -> list[list[dict[str, Any]]]:
+        for query in queries:
+            _validate_query(query, top_k)
+        if not queries:
+            return []
+        ids, scores = self.search_many(queries, top_k)
+        return [
+            [
+                {
+                    "chunk": self.chunks[i],
+                    "score": float(score),
+                }
+                for i, score in zip(row_ids, row_scores)
+                if float(score) > 0.0
+            ]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+
+    def retrieve(self, query: str, top_k: int = 3, method: str = "auto") -> list[dict[str, Any]]:
+        _validate_query(query, top_k)
+
+        ranked_idx, scores = self.search(query, top_k, method)
+        return [
+            {
+                "chunk": self.chunks[i],
+                "score": float(score),
+            }
+            for i, score in zip(ranked_idx, scores)
+            if float(score) > 0.0
+        ]
+
+    __call__ = retrieve
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _row_ids(matrix: sparse.csr_matrix) -> np.ndarray:
+    return np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+
+
+class Segment:
+    # Immutable batch of chunks: raw term counts over global term ids, the
+    # chunk texts and each chunk's document id. Deletes only clear `live`.
+    def __init__(
+        self,
+        segment_id: int,
+        counts: sparse.csr_matrix,
+        chunks: StringTable,
+        doc_ids: StringTable,
+        live: np.ndarray,
+    ) -> None:
+        self.segment_id = segment_id
+        self.counts = counts
+        self.chunks = chunks
+        self.doc_ids = doc_ids
+        self.live = live
+        self.norms: np.ndarray | None = None
+        # Index root this segment's immutable files were last written to.
+        self.persisted_root: Path | None = None
+        self._doc_rows: dict[str, list[int]] | None = None
+
+    @property
+    def doc_rows(self) -> dict[str, list[int]]:
+        if self._doc_rows is None:
+            self._doc_rows = {}
+            for row in range(len(self.doc_ids)):
+                self._doc_rows.setdefault(self.doc_ids[row], []).append(row)
+        return self._doc_rows
+
+    def live_count(self) -> int:
+        return int(self.live.sum())
+
+    def directory(self, root: Path) -> Path:
+        return root / f"segment_{self.segment_id:06d}"
+
+    def save(self, root: Path, generation: int) -> None:
+        path = self.directory(root)
+        if self.persisted_root != root.resolve() or not path.exists():
+            # Segment contents never change, so they are written once per
+            # index root. A directory already at this path is a leftover from
+            # a save that crashed before its manifest was written.
+            tmp = path.with_name(f".{path.name}.tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            np.save(tmp / "data.npy", self.counts.data)
+            np.save(tmp / "indices.npy", self.counts.indices)
+            np.save(tmp / "indptr.npy", self.counts.indptr)
+            self.chunks.save(tmp, "chunks")
+            self.doc_ids.save(tmp, "doc_ids")
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp, path)
+            self.persisted_root = root.resolve()
+        # Tombstones change between saves, so each save writes a new file and
+        # the manifest picks the generation to read.
+        np.save(path / f"live.{generation}.npy", self.live)
+
+    @classmethod
+    def load(cls, root: Path, segment_id: int, width: int, generation: int) -> Segment:
+        path = root / f"segment_{segment_id:06d}"
+        indptr = np.load(path / "indptr.npy", mmap_mode="r")
+        counts = sparse.csr_matrix(
+            (
+                np.load(path / "data.npy", mmap_mode="r"),
+                np.load(path / "indices.npy", mmap_mode="r"),
+                indptr,
+            ),
+            shape=(len(indptr) - 1, width),
+            copy=False,
+        )
+        segment = cls(
+            segment_id,
+            counts,
+            StringTable.load(path, "chunks", "r"),
+            StringTable.load(path, "doc_ids", "r"),
+            np.load(path / f"live.{generation}.npy"),
+        )
+        segment.persisted_root = root.resolve()
+        return segment
+
 
-    vectorizer = TfidfVectorizer()
-    matrix = vectorizer.fit_transform(chunks)
+class SegmentedIndex:
+    # Mutable TF-IDF retriever built LSM-style. Every add_documents call
+    # becomes a small delta segment of raw term counts. Deletes mark
+    # tombstones, and an update is a delete plus an add. After each add, the
+    # newest segment is merged into the previous one while that one is at
+    # most `merge_factor` times bigger. Segment sizes therefore grow
+    # geometrically, each chunk is rewritten O(log n) times, and merges drop
+    # deleted rows.
+    #
+    # Document frequencies are kept up to date on every change. IDF and the
+    # per-row norms are recomputed only when the next query arrives. Scores
+    # therefore match a TfidfVectorizer refit on the live chunks, without
+    # re-tokenizing anything.
+    def __init__(self, chunk_size: int = 40, overlap: int = 8, merge_factor: int = 4) -> None:
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.merge_factor = merge_factor
+        self.terms: list[str] = []
+        self.vocabulary: dict[str, int] = {}
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+        self.segments: list[Segment] = []
+        # Live document id -> sha256 of its text, used by sync_documents.
+        self.doc_hashes: dict[str, str] = {}
+        self.next_segment_id = 0
+        # Number of the last save; every mutable file on disk carries it.
+        self.generation = 0
+        self.idf: np.ndarray | None = None
 
-    def retrieve(query: str, top_k: int = 3) -> list[dict[str, Any]]:
-        if not query.strip():
-            raise ValueError("question must not be empty")
-        if top_k <= 0:
-            raise ValueError("top_k must be > 0")
+    def __len__(self) -> int:
+        return sum(segment.live_count() for segment in self.segments)
+
+    def _count_matrix(self, chunks: list[str]) -> sparse.csr_matrix:
+        indptr = [0]
+        indices: list[int] = []
+        data: list[int] = []
+        for chunk in chunks:
+            for term, count in Counter(TOKEN_PATTERN.findall(chunk.lower())).items():
+                column = self.vocabulary.get(term)
+                if column is None:
+                    column = len(self.terms)
+                    self.vocabulary[term] = column
+                    self.terms.append(term)
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(chunks), len(self.terms)),
+        )
+        counts.sort_indices()
+        return counts
+
+    def _adjust_doc_freq(self, counts: sparse.csr_matrix, sign: int) -> None:
+        if len(self.doc_freq) < len(self.terms):
+            self.doc_freq = np.concatenate(
+                [self.doc_freq, np.zeros(len(self.terms) - len(self.doc_freq), dtype=np.int64)]
+            )
+        # Each stored entry is one (chunk, term) pair, i.e. one document frequency.
+        self.doc_freq += sign * np.bincount(counts.indices, minlength=len(self.doc_freq))
+        self.idf = None
+
+    def add_documents(self, docs: list[dict[str, Any]]) -> int:
+        new_ids = [str(doc["id"]) for doc in docs]
+        if len(set(new_ids)) != len(new_ids):
+            raise ValueError("Document ids must be unique within one add_documents call")
+        clashes = set(self.doc_hashes).intersection(new_ids)
+        if clashes:
+            raise ValueError(f"Documents already indexed (use update_document): {sorted(clashes)}")
+        chunks, chunk_doc_ids = chunk_documents(docs, self.chunk_size, self.overlap)
+        for doc in docs:
+            self.doc_hashes[str(doc["id"])] = _text_hash(doc["text"])
+        if not chunks:
+            return 0
+
+        counts = self._count_matrix(chunks)
+        self._adjust_doc_freq(counts, +1)
+        self.segments.append(
+            Segment(
+                self.next_segment_id,
+                counts,
+                StringTable.from_strings(chunks),
+                StringTable.from_strings(chunk_doc_ids),
+                np.ones(len(chunks), dtype=bool),
+            )
+        )
+        self.next_segment_id += 1
+        while len(self.segments) > 1 and self.segments[-2].live_count() <= self.merge_factor * self.segments[-1].live_count():
+            self._merge(len(self.segments) - 2, len(self.segments))
+        return len(chunks)
+
+    def delete_document(self, doc_id: str) -> int:
+        doc_id = str(doc_id)
+        if doc_id not in self.doc_hashes:
+            raise ValueError(f"Unknown document id: {doc_id}")
+        removed = 0
+        for segment in self.segments:
+            rows = [row for row in segment.doc_rows.get(doc_id, ()) if segment.live[row]]
+            if not rows:
+                continue
+            segment.live[rows] = False
+            self._adjust_doc_freq(segment.counts[rows], -1)
+            removed += len(rows)
+        del self.doc_hashes[doc_id]
+        return removed
+
+    def update_document(self, doc_id: str, text: str) -> int:
+        self.delete_document(doc_id)
+        return self.add_documents([{"id": doc_id, "text": text}])
+
+    def sync_documents(self, docs: list[dict[str, Any]]) -> dict[str, int]:
+        # Bring the index in line with a full knowledge-base export. Only
+        # documents whose text changed are re-chunked and re-tokenized.
+        incoming = {str(doc["id"]): doc for doc in docs}
+        removed = [doc_id for doc_id in self.doc_hashes if doc_id not in incoming]
+        changed = [
+            doc
+            for doc_id, doc in incoming.items()
+            if doc_id in self.doc_hashes and self.doc_hashes[doc_id] != _text_hash(doc["text"])
+        ]
+        added = [doc for doc_id, doc in incoming.items() if doc_id not in self.doc_hashes]
+        for doc_id in removed:
+            self.delete_document(doc_id)
+        for doc in changed:
+            self.delete_document(str(doc["id"]))
+        if changed or added:
+            self.add_documents(changed + added)
+        return {"added": len(added), "updated": len(changed), "deleted": len(removed)}
+
+    def compact(self) -> None:
+        if self.segments:
+            self._merge(0, len(self.segments))
+
+    def _merge(self, start: int, end: int) -> None:
+        merging = self.segments[start:end]
+        width = len(self.terms)
+        matrices, chunks, doc_ids = [], [], []
+        for segment in merging:
+            rows = np.flatnonzero(segment.live)
+            widened = sparse.csr_matrix(
+                (segment.counts.data, segment.counts.indices, segment.counts.indptr),
+                shape=(segment.counts.shape[0], width),
+            )
+            matrices.append(widened[rows])
+            chunks.extend(segment.chunks[row] for row in rows)
+            doc_ids.extend(segment.doc_ids[row] for row in rows)
+        merged = Segment(
+            self.next_segment_id,
+            sparse.vstack(matrices, format="csr") if matrices else sparse.csr_matrix((0, width)),
+            StringTable.from_strings(chunks),
+            StringTable.from_strings(doc_ids),
+            np.ones(len(chunks), dtype=bool),
+        )
+        self.next_segment_id += 1
+        self.segments[start:end] = [merged]
+        self.idf = None
+
+    def _refresh(self) -> None:
+        # Smooth IDF exactly as TfidfVectorizer computes it over the live chunks.
+        if self.idf is not None:
+            return
+        self.idf = np.log((1 + len(self)) / (1 + self.doc_freq)) + 1
+        for segment in self.segments:
+            counts = segment.counts
+            weighted = counts.data * self.idf[counts.indices]
+            squares = np.bincount(_row_ids(counts), weights=weighted**2, minlength=counts.shape[0])
+            segment.norms = np.sqrt(squares)
+
+    def search(self, query: str, top_k: int) -> list[tuple[float, Segment, int]]:
+        self._refresh()
+        counts = Counter(TOKEN_PATTERN.findall(query.lower()))
+        # Terms no live chunk contains are not in a refit vocabulary either.
+        known = [
+            (self.vocabulary[term], count)
+            for term, count in counts.items()
+            if term in self.vocabulary and self.doc_freq[self.vocabulary[term]] > 0
+        ]
+        if not known:
+            return []
+        columns = np.asarray([column for column, _ in known], dtype=np.int64)
+        weights = np.asarray([count for _, count in known], dtype=float) * self.idf[columns]
+        weights /= np.linalg.norm(weights)
+
+        hits = []
+        for order, segment in enumerate(self.segments):
+            width = segment.counts.shape[1]
+            inside = columns < width
+            if not inside.any():
+                continue
+            # Counts @ (q * idf), divided by each row's TF-IDF norm, is the cosine.
+            q_vec = sparse.csr_matrix(
+                (weights[inside] * self.idf[columns[inside]], columns[inside], [0, int(inside.sum())]),
+                shape=(1, width),
+            )
+            raw = (segment.counts @ q_vec.T).toarray().ravel()
+            scores = np.divide(raw, segment.norms, out=np.zeros_like(raw), where=segment.norms > 0)
+            scores[~segment.live] = 0.0
+            for row in top_k_indices(scores, top_k):
+                if scores[row] > 0.0:
+                    hits.append((float(scores[row]), order, int(row)))
+        hits.sort(key=lambda hit: (-hit[0], hit[1], hit[2]))
+        return [(score, self.segments[order], row) for score, order, row in hits[:top_k]]
+
+    def retrieve(self, query: str, top_k: int = 3) -> list[dict[str, Any]]:
+        _validate_query(query, top_k)
+        return [
+            {
+                "chunk": segment.chunks[row],
+                "score": score,
+            }
+            for score, segment, row in self.search(query, top_k)
+        ]
+
+    __call__ = retrieve
+
+    def save(self, path: str | Path) -> None:
+        # Only segments created since the last save are written. Files that
+        # change between saves (tombstones, terms, document frequencies and
+        # hashes) are written under a new generation number, so the index the
+        # current manifest points at stays intact until the manifest is
+        # replaced. The previous generation and merged-away segments are
+        # deleted afterwards.
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        generation = self.generation + 1
+        for segment in self.segments:
+            segment.save(root, generation)
+        StringTable.from_strings(self.terms).save(root, f"terms.{generation}")
+        np.save(root / f"doc_freq.{generation}.npy", self.doc_freq)
+        (root / f"documents.{generation}.json").write_text(json.dumps(self.doc_hashes), encoding="utf-8")
+        manifest = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "chunk_size": self.chunk_size,
+            "overlap": self.overlap,
+            "merge_factor": self.merge_factor,
+            "next_segment_id": self.next_segment_id,
+            "generation": generation,
+            "segments": [segment.segment_id for segment in self.segments],
+        }
+        tmp = root / ".manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, root / "manifest.json")
+        self.generation = generation
+
+        current = {segment.directory(root).name for segment in self.segments}
+        for stale in root.glob("segment_*"):
+            if stale.name not in current:
+                shutil.rmtree(stale)
+        versioned = [*root.glob("terms.*.npy"), *root.glob("doc_freq.*.npy"), *root.glob("documents.*.json")]
+        for segment in self.segments:
+            versioned.extend(segment.directory(root).glob("live.*.npy"))
+        for old in versioned:
+            if old.name.split(".")[1] != str(generation):
+                old.unlink()
+
+    @classmethod
+    def load(cls, path: str | Path) -> SegmentedIndex:
+        root = Path(path)
+        manifest_path = root / "manifest.json"
+        if not manifest_path.exists():
+            raise ValueError(f"Index not found: {root}")
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest["format_version"] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format {manifest['format_version']} in {root}")
+
+        index = cls(manifest["chunk_size"], manifest["overlap"], manifest["merge_factor"])
+        generation = manifest["generation"]
+        terms = StringTable.load(root, f"terms.{generation}", None)
+        index.terms = [terms[i] for i in range(len(terms))]
+        index.vocabulary = {term: i for i, term in enumerate(index.terms)}
+        index.doc_freq = np.load(root / f"doc_freq.{generation}.npy")
+        index.doc_hashes = json.loads((root / f"documents.{generation}.json").read_text(encoding="utf-8"))
+        index.next_segment_id = manifest["next_segment_id"]
+        index.generation = generation
+        index.segments = [
+            Segment.load(root, segment_id, len(index.terms), generation) for segment_id in manifest["segments"]
+        ]
+        return index
+
+
+@lru_cache(maxsize=1 << 20)
+def _token_hash(token: str) -> int:
+    # blake2b rather than hash(): str hashes are salted per process.
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashingEmbedder:
+    # Offline stand-in for an embedding model: signed feature hashing of the
+    # query tokens into `dim` buckets. Any callable that maps list[str] to an
+    # (n, dim) array can be used with DenseIndex instead.
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                value = _token_hash(token)
+                out[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        return out
+
+    def describe(self) -> dict[str, Any]:
+        return {"name": "hashing", "dim": self.dim}
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
 
-        q_vec = vectorizer.transform([query])
-        scores = cosine_similarity(q_vec, matrix).flatten()
 
-        ranked_idx = scores.argsort()[::-1][:top_k]
-        results = [
+def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # Blocked so vectors @ centroids.T never exceeds SCORE_BLOCK_ELEMENTS.
+    block = max(1, SCORE_BLOCK_ELEMENTS // len(centroids))
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        part = np.asarray(vectors[start : start + block], dtype=np.float32)
+        assign[start : start + block] = (part @ centroids.T).argmax(axis=1)
+    return assign
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, n_clusters: int, iterations: int = 10, sample_size: int = 256, seed: int = 0
+) -> np.ndarray:
+    # Lloyd iterations on a sample of `sample_size` points per cluster. The
+    # centroids are re-normalized each round, so "nearest" means highest cosine.
+    rng = np.random.default_rng(seed)
+    take = min(len(vectors), n_clusters * sample_size)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), size=take, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest_centroids(sample, centroids)
+        members = sparse.csr_matrix(
+            (np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+            shape=(n_clusters, len(sample)),
+        )
+        sums = members @ sample
+        empty = np.bincount(assign, minlength=n_clusters) == 0
+        # Clusters that lost every point restart from random sample points.
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class DenseIndex:
+    # IVF-flat approximate nearest-neighbour index over unit-length
+    # embeddings. Spherical k-means splits the corpus into `n_lists` clusters,
+    # and vectors are stored grouped by cluster, so every list is one
+    # contiguous slice. A query scores the centroids, then scans only the
+    # `n_probe` closest lists. float16 storage halves memory; each probed
+    # slice is upcast to float32 for the dot product.
+    def __init__(
+        self,
+        embed,
+        centroids: np.ndarray,
+        list_ptr: np.ndarray,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        chunks: StringTable | None,
+        n_probe: int = 8,
+    ) -> None:
+        self.embed = embed
+        self.centroids = centroids
+        self.list_ptr = list_ptr
+        self.vectors = vectors
+        self.ids = ids
+        self.chunks = chunks
+        self.n_probe = n_probe
+
+    @classmethod
+    def from_vectors(
+        cls,
+        vectors: np.ndarray,
+        embed=None,
+        chunks: list[str] | None = None,
+        n_lists: int | None = None,
+        dtype: str = "float32",
+        n_probe: int = 8,
+        seed: int = 0,
+    ) -> DenseIndex:
+        if len(vectors) == 0:
+            raise ValueError("vectors must not be empty")
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        vectors = _normalize_rows(vectors)
+        # sqrt(n) lists balances centroid scoring against list scanning.
+        n_lists = min(len(vectors), n_lists or max(1, int(np.sqrt(len(vectors)))))
+        centroids = spherical_kmeans(vectors, n_lists, seed=seed)
+        assign = _nearest_centroids(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        list_ptr = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=list_ptr[1:])
+        return cls(
+            embed=embed,
+            centroids=centroids,
+            list_ptr=list_ptr,
+            vectors=vectors[order].astype(dtype),
+            ids=order.astype(np.int64),
+            chunks=StringTable.from_strings(chunks) if chunks is not None else None,
+            n_probe=n_probe,
+        )
+
+    @classmethod
+    def build(cls, chunks: list[str], embed=None, **options) -> DenseIndex:
+        if not chunks:
+            raise ValueError("chunks must not be empty")
+        embed = embed or HashingEmbedder()
+        return cls.from_vectors(embed(chunks), embed=embed, chunks=chunks, **options)
+
+    def save(self, path: str | Path, kb_sha256: str | None = None) -> None:
+        target = Path(path)
+        tmp = target.with_name(f".{target.name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "centroids.npy", self.centroids)
+        np.save(tmp / "list_ptr.npy", self.list_ptr)
+        np.save(tmp / "vectors.npy", self.vectors)
+        np.save(tmp / "ids.npy", self.ids)
+        if self.chunks is not None:
+            self.chunks.save(tmp, "chunks")
+        describe = getattr(self.embed, "describe", None)
+        meta = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "kind": "dense",
+            "n_probe": self.n_probe,
+            "dtype": str(self.vectors.dtype),
+            "embedder": describe() if describe else None,
+            "chunks": self.chunks is not None,
+            "kb_sha256": kb_sha256,
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, path: str | Path, embed=None, mmap: bool = True) -> DenseIndex:
+        index_dir = Path(path)
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        if meta["format_version"] != INDEX_FORMAT_VERSION or meta.get("kind") != "dense":
+            raise ValueError(f"Not a dense index: {index_dir}")
+        if embed is None:
+            if not meta["embedder"] or meta["embedder"]["name"] != "hashing":
+                raise ValueError("This index needs the embedding callable it was built with")
+            embed = HashingEmbedder(meta["embedder"]["dim"])
+        mmap_mode = "r" if mmap else None
+        return cls(
+            embed=embed,
+            centroids=np.load(index_dir / "centroids.npy"),
+            list_ptr=np.load(index_dir / "list_ptr.npy"),
+            vectors=np.load(index_dir / "vectors.npy", mmap_mode=mmap_mode),
+            ids=np.load(index_dir / "ids.npy", mmap_mode=mmap_mode),
+            chunks=StringTable.load(index_dir, "chunks", mmap_mode) if meta["chunks"] else None,
+            n_probe=meta["n_probe"],
+        )
+
+    def search_vector(
+        self, query: np.ndarray, top_k: int, n_probe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        query = _normalize_rows(query.reshape(1, -1))[0]
+        probe = top_k_indices(self.centroids @ query, min(n_probe or self.n_probe, len(self.centroids)))
+        rows, scores = [], []
+        for cluster in probe:
+            start, end = self.list_ptr[cluster], self.list_ptr[cluster + 1]
+            if start == end:
+                continue
+            rows.append(np.arange(start, end))
+            scores.append(np.asarray(self.vectors[start:end], dtype=np.float32) @ query)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        best = top_k_indices(scores, top_k)
+        return np.asarray(self.ids[rows[best]]), scores[best]
+
+    def search_exact(self, query: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        # Brute-force cosine over every vector: the recall baseline.
+        query = _normalize_rows(query.reshape(1, -1))[0]
+        scores = np.empty(len(self.vectors), dtype=np.float32)
+        block = SCORE_BLOCK_ELEMENTS // max(1, self.vectors.shape[1])
+        for start in range(0, len(self.vectors), block):
+            scores[start : start + block] = np.asarray(self.vectors[start : start + block], dtype=np.float32) @ query
+        best = top_k_indices(scores, top_k)
+        return np.asarray(self.ids[best]), scores[best]
+
+    def retrieve(self, query: str, top_k: int = 3, n_probe: int | None = None) -> list[dict[str, Any]]:
+        _validate_query(query, top_k)
+        if self.chunks is None:
+            raise ValueError("Index was built without chunk texts")
+        ids, scores = self.search_vector(np.asarray(self.embed([query]))[0], top_k, n_probe)
+        return [
             {
-                "chunk": chunks[i],
-                "score": float(scores[i]),
+                "chunk": self.chunks[i],
+                "score": float(score),
             }
-            for i in ranked_idx
-            if float(scores[i]) > 0.0
+            for i, score in zip(ids, scores)
+            if float(score) > 0.0
         ]
-        return results
 
-    return retrieve
+    __call__ = retrieve
+
+
+def build_retriever(chunks: list[str]):
+    return TfidfIndex.build(chunks)
+
+
+def build_index(
+    kb_path: str,
+    index_dir: str,
+    chunk_size: int = 40,
+    overlap: int = 8,
+    dense: bool = False,
+    **dense_options,
+) -> TfidfIndex | DenseIndex:
+    docs = load_knowledge_base(kb_path)
+    chunks, chunk_doc_ids = chunk_documents(docs, chunk_size, overlap)
+    if dense:
+        index = DenseIndex.build(chunks, **dense_options)
+    else:
+        index = TfidfIndex.build(chunks, chunk_doc_ids)
+    # The knowledge base's hash lets index_is_current skip unchanged rebuilds.
+    index.save(index_dir, kb_sha256=file_sha256(Path(kb_path)))
+    return index
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_is_current(kb_path: str, index_dir: str) -> bool:
+    # True when index_dir holds a saved index of this format built from the
+    # knowledge base's current contents.
+    meta_path = Path(index_dir) / "meta.json"
+    if not meta_path.exists():
+        return False
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    return meta.get("format_version") == INDEX_FORMAT_VERSION and meta.get("kb_sha256") == file_sha256(Path(kb_path))
+
+
+def load_index(index_dir: str) -> TfidfIndex | SegmentedIndex | DenseIndex:
+    path = Path(index_dir)
+    if (path / "manifest.json").exists():
+        return SegmentedIndex.load(path)
+    meta_path = path / "meta.json"
+    if meta_path.exists() and json.loads(meta_path.read_text(encoding="utf-8")).get("kind") == "dense":
+        return DenseIndex.load(path)
+    return TfidfIndex.load(path)
 
 
 def answer_question(question: str, retriever, top_k: int = 3) -> dict[str, Any]:
     start = time.perf_counter()
     results = retriever(question, top_k=top_k)
     latency_ms = (time.perf_counter() - start) * 1000
+    return format_answer(results, latency_ms)
+
 
+def format_answer(results: list[dict[str, Any]], latency_ms: float) -> dict[str, Any]:
     if not results:
         return {
             "answer": "insufficient context",
@@ -118,11 +1135,22 @@ def evaluate_batch(
     grounded_pass = 0
     items = []
 
-    for pair in qa_pairs:
+    questions = [pair["question"] for pair in qa_pairs]
+    retrieve_many = getattr(retriever, "retrieve_many", None)
+    if retrieve_many is not None:
+        # One batched retrieval for every question; each gets an equal share
+        # of the batch time as its latency.
+        start = time.perf_counter()
+        batch_results = retrieve_many(questions, top_k=top_k)
+        latency_ms = (time.perf_counter() - start) * 1000 / total
+        responses = [format_answer(results, latency_ms) for results in batch_results]
+    else:
+        responses = [answer_question(question, retriever, top_k=top_k) for question in questions]
+
+    for pair, response in zip(qa_pairs, responses):
         question = pair["question"]
         expected_keyword = pair["expected_keyword"].lower()
 
-        response = answer_question(question, retriever, top_k=top_k)
         evidence_text = " ".join(response["evidence"]).lower()
         passed = expected_keyword in evidence_text
 
@@ -143,3 +1171,71 @@ def evaluate_batch(
         "grounded_rate": round(grounded_pass / total, 4),
         "items": items,
     }
+
+
+def parse_args() -> argparse.Namespace:
+    base = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Build or query a saved retrieval index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build-index", help="Chunk the knowledge base and save its TF-IDF index.")
+    build.add_argument("--kb", default=str(base / "sample" / "data" / "knowledge_base.json"))
+    build.add_argument("--index-dir", default=str(base / "sample" / "index"))
+    build.add_argument("--chunk-size", type=int, default=40)
+    build.add_argument("--overlap", type=int, default=8)
+    build.add_argument("--dense", action="store_true", help="Build an IVF embedding index instead of TF-IDF.")
+    build.add_argument("--dim", type=int, default=256, help="HashingEmbedder dimension (--dense).")
+    build.add_argument("--n-lists", type=int, default=None, help="IVF lists (--dense; default sqrt(chunks)).")
+    build.add_argument("--float16", action="store_true", help="Store dense vectors as float16.")
+
+    sync = commands.add_parser(
+        "sync-index", help="Apply knowledge-base changes to an incremental (segmented) index."
+    )
+    sync.add_argument("--kb", default=str(base / "sample" / "data" / "knowledge_base.json"))
+    sync.add_argument("--index-dir", default=str(base / "sample" / "segments"))
+    sync.add_argument("--chunk-size", type=int, default=40)
+    sync.add_argument("--overlap", type=int, default=8)
+    sync.add_argument("--compact", action="store_true", help="Merge all segments and drop deleted rows.")
+
+    query = commands.add_parser("query", help="Answer a question from a saved index.")
+    query.add_argument("question")
+    query.add_argument("--index-dir", default=str(base / "sample" / "index"))
+    query.add_argument("--top-k", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == "build-index":
+        started = time.perf_counter()
+        if args.dense:
+            index = build_index(
+                args.kb,
+                args.index_dir,
+                chunk_size=args.chunk_size,
+                overlap=args.overlap,
+                dense=True,
+                embed=HashingEmbedder(args.dim),
+                n_lists=args.n_lists,
+                dtype="float16" if args.float16 else "float32",
+            )
+        else:
+            index = build_index(args.kb, args.index_dir, chunk_size=args.chunk_size, overlap=args.overlap)
+        print(f"Indexed {len(index.chunks)} chunks in {time.perf_counter() - started:.2f}s")
+    elif args.command == "sync-index":
+        started = time.perf_counter()
+        if (Path(args.index_dir) / "manifest.json").exists():
+            index = SegmentedIndex.load(args.index_dir)
+        else:
+            index = SegmentedIndex(chunk_size=args.chunk_size, overlap=args.overlap)
+        changes = index.sync_documents(load_knowledge_base(args.kb))
+        if args.compact:
+            index.compact()
+        index.save(args.index_dir)
+        print(f"{changes}; {len(index.segments)} segments, {len(index)} live chunks in {time.perf_counter() - started:.2f}s")
+    else:
+        started = time.perf_counter()
+        index = load_index(args.index_dir)
+        print(f"Loaded index in {(time.perf_counter() - started) * 1000:.2f} ms")
+        print(json.dumps(answer_question(args.question, index, top_k=args.top_k), indent=2))
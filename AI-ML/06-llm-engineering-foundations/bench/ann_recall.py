@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+def clustered_vectors(n: int, dim: int, topics: int, rng) -> np.ndarray:
+    # Embedding-like data: points scattered around many topic directions.
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=n)
+    out = np.empty((n, dim), dtype=np.float32)
+    block = 100_000
+    for start in range(0, n, block):
+        part = labels[start : start + block]
+        out[start : start + block] = centers[part] + 0.6 * rng.standard_normal((len(part), dim)).astype(np.float32)
+    return out
+
+
+def exact_neighbours(solutions, vectors: np.ndarray, queries: np.ndarray, top_k: int) -> list[set[int]]:
+    # Ground truth from a float32 brute-force scan of the original vectors,
+    # so a float16 index is scored against the true neighbours rather than
+    # against its own rounded copy.
+    vectors = solutions._normalize_rows(vectors)
+    queries = solutions._normalize_rows(queries)
+    block = max(1, solutions.SCORE_BLOCK_ELEMENTS // len(vectors))
+    truth = []
+    for start in range(0, len(queries), block):
+        ids, _ = solutions.top_k_rows(queries[start : start + block] @ vectors.T, top_k)
+        truth.extend(set(row.tolist()) for row in ids)
+    return truth
+
+
+def recall(truth: list[set[int]], found: list[np.ndarray]) -> float:
+    return float(np.mean([len(truth[i] & set(ids.tolist())) / len(truth[i]) for i, ids in enumerate(found)]))
+
+
+def ms(latencies: list[float], q: float) -> float:
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+
+def timed_search(search, queries: np.ndarray) -> tuple[list[np.ndarray], list[float]]:
+    ids, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        found, _ = search(query)
+        latencies.append(time.perf_counter() - started)
+        ids.append(found)
+    return ids, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="IVF recall@k and latency vs exact cosine search.")
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--topics", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float16"])
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    solutions = load_solutions()
+    rng = np.random.default_rng(21)
+    vectors = clustered_vectors(args.vectors, args.dim, args.topics, rng)
+    queries = clustered_vectors(args.queries, args.dim, args.topics, rng)
+    truth = exact_neighbours(solutions, vectors, queries, args.top_k)
+
+    results = []
+    for dtype in args.dtypes:
+        started = time.perf_counter()
+        index = solutions.DenseIndex.from_vectors(vectors, dtype=dtype)
+        build_seconds = time.perf_counter() - started
+
+        # search_exact scans the stored dtype, so for float16 this is the cost
+        # (and recall) of brute force over the halved copy, upcast block by block.
+        exact_ids, exact_latencies = timed_search(lambda q: index.search_exact(q, args.top_k), queries)
+        row = {
+            "dtype": dtype,
+            "lists": len(index.centroids),
+            "build_seconds": round(build_seconds, 2),
+            "vector_mb": round(index.vectors.nbytes / 1024**2, 1),
+            f"exact_recall_at_{args.top_k}": round(recall(truth, exact_ids), 4),
+            "exact_p50_ms": ms(exact_latencies, 50),
+            "ivf": [],
+        }
+        for n_probe in args.n_probe:
+            found, latencies = timed_search(lambda q: index.search_vector(q, args.top_k, n_probe), queries)
+            row["ivf"].append(
+                {
+                    "n_probe": n_probe,
+                    f"recall_at_{args.top_k}": round(recall(truth, found), 4),
+                    "p50_ms": ms(latencies, 50),
+                    "p95_ms": ms(latencies, 95),
+                    "p50_ms_per_probe": round(ms(latencies, 50) / n_probe, 4),
+                }
+            )
+        results.append(row)
+        print(json.dumps(row))
+
+    report = {"vectors": args.vectors, "dim": args.dim, "top_k": args.top_k, "results": results}
+    by_dtype = {row["dtype"]: row for row in results}
+    if {"float32", "float16"} <= by_dtype.keys():
+        # float16 lists are upcast to float32 on every probe, which costs more
+        # than the smaller read saves.
+        per_probe = {
+            dtype: np.mean([entry["p50_ms_per_probe"] for entry in by_dtype[dtype]["ivf"]]) for dtype in by_dtype
+        }
+        report["float16_slowdown"] = {
+            "per_probe": round(float(per_probe["float16"] / per_probe["float32"]), 2),
+            "exact": round(by_dtype["float16"]["exact_p50_ms"] / by_dtype["float32"]["exact_p50_ms"], 2),
+        }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+def make_texts(n: int, vocab: int, length: int, rng) -> list[str]:
+    probs = 1.0 / np.arange(1, vocab + 1)
+    tokens = rng.choice(vocab, size=(n, length), p=probs / probs.sum())
+    return [" ".join(f"w{t:06d}" for t in row) for row in tokens]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-query retrieve() loop vs retrieve_many().")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=100_000)
+    parser.add_argument("--loop-queries", type=int, default=2_000, help="Loop timing is extrapolated from this many.")
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    solutions = load_solutions()
+    rng = np.random.default_rng(9)
+    index = solutions.TfidfIndex.build(make_texts(args.chunks, args.vocab, 40, rng), postings=False)
+    queries = make_texts(args.queries, args.vocab, 6, rng)
+
+    started = time.perf_counter()
+    batched = index.retrieve_many(queries, top_k=args.top_k)
+    batched_seconds = time.perf_counter() - started
+
+    sample = queries[: args.loop_queries]
+    started = time.perf_counter()
+    looped = [index.retrieve(query, top_k=args.top_k, method="matrix") for query in sample]
+    loop_seconds = (time.perf_counter() - started) * len(queries) / len(sample)
+
+    mismatches = sum(
+        not np.allclose([r["score"] for r in a], [r["score"] for r in b]) for a, b in zip(looped, batched)
+    )
+    report = {
+        "chunks": args.chunks,
+        "queries": args.queries,
+        "retrieve_many_seconds": round(batched_seconds, 2),
+        "retrieve_loop_seconds_estimated": round(loop_seconds, 2),
+        "speedup": round(loop_seconds / batched_seconds, 1),
+        "score_mismatches": mismatches,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+def zipf_words(vocab_size: int) -> tuple[np.ndarray, np.ndarray]:
+    words = np.array([f"w{i:06d}" for i in range(vocab_size)], dtype=object)
+    weights = 1.0 / np.arange(1, vocab_size + 1)
+    return words, weights / weights.sum()
+
+
+def make_chunks(n: int, words: np.ndarray, probs: np.ndarray, length: int, rng) -> list[str]:
+    tokens = rng.choice(words, size=(n, length), p=probs)
+    return [" ".join(row) for row in tokens]
+
+
+def percentile_ms(samples: list[float], q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def baseline_search(index, query: str, top_k: int):
+    # The original build_retriever ranking: full scores, then a full argsort.
+    scores = index.scores(query)
+    ranked = scores.argsort()[::-1][:top_k]
+    return ranked, scores[ranked]
+
+
+def same_results(a, b) -> bool:
+    # Same number of hits and the same scores rank by rank. Ids must match too,
+    # except among hits tied with the last one, where either may be cut off.
+    (ids_a, scores_a), (ids_b, scores_b) = a, b
+    if len(ids_a) != len(ids_b) or not np.allclose(scores_a, scores_b):
+        return False
+    if len(ids_a) == 0:
+        return True
+    decided = ~np.isclose(scores_a, scores_a[-1])
+    return set(ids_a[decided].tolist()) == set(ids_b[decided].tolist())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-query retrieval latency as the corpus grows.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--chunk-words", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    solutions = load_solutions()
+    rng = np.random.default_rng(3)
+    words, probs = zipf_words(args.vocab)
+    queries = make_chunks(args.queries, words, probs, 5, rng)
+
+    results = []
+    for size in args.sizes:
+        started = time.perf_counter()
+        index = solutions.TfidfIndex.build(make_chunks(size, words, probs, args.chunk_words, rng))
+        build_seconds = time.perf_counter() - started
+
+        row = {"chunks": size, "build_seconds": round(build_seconds, 2)}
+        methods = {
+            "argsort": lambda q: baseline_search(index, q, args.top_k),
+            "matrix": lambda q: index.search(q, args.top_k, method="matrix"),
+            "postings": lambda q: index.search(q, args.top_k, method="postings"),
+        }
+        answers = {}
+        for name, search in methods.items():
+            latencies = []
+            answers[name] = []
+            for query in queries:
+                started = time.perf_counter()
+                answers[name].append(search(query))
+                latencies.append(time.perf_counter() - started)
+            row[f"{name}_p50_ms"] = percentile_ms(latencies, 50)
+            row[f"{name}_p95_ms"] = percentile_ms(latencies, 95)
+
+        row["postings_matches_matrix"] = all(
+            same_results(a, b) for a, b in zip(answers["matrix"], answers["postings"])
+        )
+        results.append(row)
+        print(row)
+
+    report = {"top_k": args.top_k, "vocab": args.vocab, "results": results}
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+LESSON_DIR = Path(__file__).resolve().parent
+
+
+def load_solutions():
+    # 03-solutions.py is not an importable module name, so benches and tests
+    # load it by path. It is registered in sys.modules, which lets worker
+    # processes unpickle references to its functions and later calls reuse it.
+    module = sys.modules.get("solutions")
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location("solutions", LESSON_DIR / "03-solutions.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solutions_loader import load_solutions  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def solutions():
+    return load_solutions()
+
+
+@pytest.fixture(scope="module")
+def index(solutions):
+    return solutions.TfidfIndex.build(
+        [
+            "refund policy for annual plans",
+            "shipping times for international orders",
+            "reset a forgotten password",
+            "refund requests need an order number",
+            "contact support by email",
+        ]
+    )
+
+
+def test_methods_agree_when_fewer_than_k_chunks_match(index) -> None:
+    matrix_ids, matrix_scores = index.search("refund", 5, method="matrix")
+    postings_ids, postings_scores = index.search("refund", 5, method="postings")
+
+    assert sorted(matrix_ids.tolist()) == [0, 3]
+    assert matrix_ids.tolist() == postings_ids.tolist()
+    assert np.allclose(matrix_scores, postings_scores)
+    assert (matrix_scores > 0).all()
+
+
+def test_methods_agree_when_nothing_matches(index) -> None:
+    for method in ("matrix", "postings"):
+        ids, scores = index.search("warranty", 3, method=method)
+        assert len(ids) == 0 and len(scores) == 0
+
+
+DOCS = [
+    {"id": "refunds", "text": "Refunds are accepted within 30 days of purchase."},
+    {"id": "support", "text": "Support is available from 9am to 5pm on weekdays."},
+    {"id": "passwords", "text": "Passwords must be at least 12 characters long."},
+]
+
+
+def test_segmented_index_saves_to_a_second_directory(solutions, tmp_path) -> None:
+    index = solutions.SegmentedIndex()
+    index.add_documents(DOCS[:2])
+    index.add_documents(DOCS[2:])
+    index.save(tmp_path / "a")
+    index.save(tmp_path / "copy")
+
+    loaded = solutions.SegmentedIndex.load(tmp_path / "a")
+    loaded.delete_document("support")
+    loaded.save(tmp_path / "b")
+
+    expected = loaded.retrieve("How long do refunds take?")
+    assert solutions.SegmentedIndex.load(tmp_path / "b").retrieve("How long do refunds take?") == expected
+    assert len(solutions.SegmentedIndex.load(tmp_path / "b")) == len(loaded)
+    assert len(solutions.SegmentedIndex.load(tmp_path / "copy")) == len(index)